@@ -0,0 +1,65 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import sys
+
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action import ActionBase
+from ansible.utils.vars import merge_hash
+
+
+class ActionModule(ActionBase):
+    """Run the mgdis.ovh modules on the controller.
+
+    The modules only talk to the OVH API, so wherever a task targets, its
+    module runs on the controller with the local connection. All the hosts
+    of a play then share the controller state of the modules: the name to id
+    indexes of ``cache_dir``, the ``api_rate_limit`` budget and the cached
+    time delta. The modules run with the Python of ansible-playbook, which
+    needs python-ovh. Tasks delegated with ``delegate_to`` still run on the
+    delegated host, and ``ovh_run_on_controller: false`` on a host runs the
+    modules on the host itself.
+
+    The task id defaults to the task and host, and the trace id to the play,
+    so that the traces and profiles of one play can be told apart.
+    """
+
+    _supports_check_mode = True
+    _supports_async = True
+
+    def _controller_connection(self):
+        play_context = self._play_context.copy()
+        play_context.become = False
+        connection = self._shared_loader_obj.connection_loader.get('local', play_context, '/dev/null')
+        connection.set_options()
+        return connection
+
+    def run(self, tmp=None, task_vars=None):
+        task_vars = dict(task_vars or {})
+
+        # Persistent connections, e.g. the mgdis.ovh.ovh httpapi plugin,
+        # already run the modules on the controller
+        local = self._connection.transport == 'local' or getattr(self._connection, 'socket_path', None)
+        if boolean(task_vars.get('ovh_run_on_controller', True), strict=False) and not local and not self._task.delegate_to:
+            self._connection = self._controller_connection()
+            task_vars['ansible_python_interpreter'] = task_vars.get('ansible_playbook_python') or sys.executable
+
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+
+        module_args = dict(self._task.args)
+        module_args.setdefault('api_task_id', '{0}-{1}'.format(self._task._uuid, task_vars.get('inventory_hostname')))
+        play = self._task.get_play() if hasattr(self._task, 'get_play') else None
+        trace_id = os.environ.get('OVH_TRACE_ID') or getattr(play, '_uuid', None)
+        if trace_id:
+            module_args.setdefault('api_trace_id', trace_id)
+
+        wrap_async = self._task.async_val and not self._connection.has_native_async
+        result = merge_hash(result, self._execute_module(module_args=module_args, task_vars=task_vars, wrap_async=wrap_async))
+
+        if not wrap_async:
+            # remove a temporary path we created
+            self._remove_tmp_path(self._connection._shell.tmpdir)
+
+        return result
@@ -0,0 +1,169 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: api_stats
+    type: aggregate
+    short_description: Summarize the OVH API usage of a play
+    description:
+        - Aggregates the C(api_stats) returned by the mgdis.ovh modules when their C(api_stats) option is enabled.
+        - At the end of the playbook, prints the calls, cumulative and p95 latency, errors of each API endpoint,
+          the cache hit ratio, the retries and the slowest tasks.
+        - Optionally writes the same figures to a Prometheus textfile, e.g. for the node exporter textfile collector.
+    requirements:
+        - enable in configuration with C(callbacks_enabled = mgdis.ovh.api_stats)
+        - set the C(api_stats) option of the modules, e.g. with C(module_defaults) or the C(OVH_API_STATS) environment variable
+    options:
+        slowest_tasks:
+            description: Number of slowest tasks listed in the summary.
+            type: int
+            default: 5
+            env:
+                - name: OVH_API_STATS_SLOWEST_TASKS
+            ini:
+                - section: callback_mgdis_ovh_api_stats
+                  key: slowest_tasks
+        prometheus_textfile:
+            description: Path of a Prometheus textfile where the metrics of the play are written.
+            type: path
+            env:
+                - name: OVH_API_STATS_PROMETHEUS_TEXTFILE
+            ini:
+                - section: callback_mgdis_ovh_api_stats
+                  key: prometheus_textfile
+'''
+
+import os
+import tempfile
+
+from ansible.plugins.callback import CallbackBase
+
+
+def percentile(values, rank):
+    """Nearest-rank percentile of ``values``."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, int(round(rank / 100.0 * len(values))) - 1))]
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'mgdis.ovh.api_stats'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, *args, **kwargs):
+        super(CallbackModule, self).__init__(*args, **kwargs)
+        self.endpoints = {}
+        self.tasks = []
+        self.totals = {'tasks': 0, 'calls': 0, 'time': 0.0, 'bytes': 0, 'retries': 0, 'cache_hits': 0, 'cache_misses': 0}
+
+    def _collect(self, result):
+        results = result._result.get('results')
+        stats = [item.get('api_stats') for item in results if isinstance(item, dict)] if isinstance(results, list) else []
+        stats.append(result._result.get('api_stats'))
+        for api_stats in stats:
+            if isinstance(api_stats, dict):
+                self._add(api_stats, result._host.get_name(), result._task.get_name())
+
+    def _add(self, api_stats, host, task):
+        totals = self.totals
+        totals['tasks'] += 1
+        totals['calls'] += api_stats.get('calls', 0)
+        totals['time'] += api_stats.get('total_time', 0.0)
+        totals['bytes'] += api_stats.get('bytes', 0)
+        totals['retries'] += api_stats.get('retries', 0)
+        totals['cache_hits'] += api_stats.get('cache_hits', 0)
+        totals['cache_misses'] += api_stats.get('cache_misses', 0)
+        self.tasks.append((api_stats.get('total_time', 0.0), api_stats.get('calls', 0), host, task))
+
+        for name, endpoint in (api_stats.get('endpoints') or {}).items():
+            aggregate = self.endpoints.setdefault(name, {'calls': 0, 'time': 0.0, 'errors': 0, 'bytes': 0, 'latencies': []})
+            aggregate['calls'] += endpoint.get('calls', 0)
+            aggregate['time'] += endpoint.get('time', 0.0)
+            aggregate['errors'] += endpoint.get('errors', 0)
+            aggregate['bytes'] += endpoint.get('bytes', 0)
+            aggregate['latencies'].extend(endpoint.get('latencies') or [])
+
+    def v2_runner_on_ok(self, result):
+        self._collect(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._collect(result)
+
+    def _cache_ratio(self):
+        lookups = self.totals['cache_hits'] + self.totals['cache_misses']
+        return float(self.totals['cache_hits']) / lookups if lookups else None
+
+    def v2_playbook_on_stats(self, stats):
+        if not self.totals['tasks']:
+            return
+
+        self._display.banner('OVH API STATS')
+        totals = self.totals
+        ratio = self._cache_ratio()
+        self._display.display('%d tasks, %d calls, %.3fs, %d bytes, %d retries, cache hit ratio %s' % (
+            totals['tasks'], totals['calls'], totals['time'], totals['bytes'], totals['retries'],
+            '%.1f%%' % (ratio * 100) if ratio is not None else 'n/a'
+        ))
+
+        self._display.display('')
+        self._display.display('%8s %10s %8s %7s  %s' % ('calls', 'total s', 'p95 s', 'errors', 'endpoint'))
+        for name, endpoint in sorted(self.endpoints.items(), key=lambda item: -item[1]['time']):
+            self._display.display('%8d %10.3f %8.3f %7d  %s' % (
+                endpoint['calls'], endpoint['time'], percentile(endpoint['latencies'], 95), endpoint['errors'], name
+            ))
+
+        slowest = sorted(self.tasks, reverse=True)[:self.get_option('slowest_tasks')]
+        if slowest:
+            self._display.display('')
+            self._display.display('Slowest tasks:')
+            for total_time, calls, host, task in slowest:
+                self._display.display('%10.3fs %6d calls  %s | %s' % (total_time, calls, host, task))
+
+        textfile = self.get_option('prometheus_textfile')
+        if textfile:
+            self._write_prometheus(textfile)
+
+    def _write_prometheus(self, path):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append('# HELP %s %s' % (name, help_text))
+            lines.append('# TYPE %s %s' % (name, kind))
+            for labels, value in samples:
+                label_text = ','.join('%s="%s"' % (key, _label(labels[key])) for key in sorted(labels))
+                lines.append('%s%s %s' % (name, '{%s}' % label_text if label_text else '', repr(round(float(value), 6))))
+
+        endpoints = sorted(self.endpoints.items())
+        labels = [dict(zip(('method', 'path'), name.split(' ', 1))) for name, _ in endpoints]
+        metric('ovh_api_calls_total', 'counter', 'API calls of the play per endpoint.',
+               [(label, endpoint['calls']) for label, (_, endpoint) in zip(labels, endpoints)])
+        metric('ovh_api_errors_total', 'counter', 'API calls which did not succeed per endpoint.',
+               [(label, endpoint['errors']) for label, (_, endpoint) in zip(labels, endpoints)])
+        metric('ovh_api_latency_seconds_sum', 'counter', 'Cumulative API latency per endpoint.',
+               [(label, endpoint['time']) for label, (_, endpoint) in zip(labels, endpoints)])
+        metric('ovh_api_latency_p95_seconds', 'gauge', '95th percentile of the API latency per endpoint.',
+               [(label, percentile(endpoint['latencies'], 95)) for label, (_, endpoint) in zip(labels, endpoints)])
+        metric('ovh_api_response_bytes_total', 'counter', 'Size of the API responses per endpoint.',
+               [(label, endpoint['bytes']) for label, (_, endpoint) in zip(labels, endpoints)])
+        metric('ovh_api_tasks_total', 'counter', 'Tasks which reported API stats.', [({}, self.totals['tasks'])])
+        metric('ovh_api_retries_total', 'counter', 'Retried API calls.', [({}, self.totals['retries'])])
+        metric('ovh_api_cache_hits_total', 'counter', 'Controller cache hits.', [({}, self.totals['cache_hits'])])
+        metric('ovh_api_cache_misses_total', 'counter', 'Controller cache misses.', [({}, self.totals['cache_misses'])])
+
+        directory = os.path.dirname(os.path.abspath(path))
+        try:
+            # Written then renamed so that the collector never reads half a file
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.ovh_api_stats')
+            with os.fdopen(fd, 'w') as textfile:
+                textfile.write('\n'.join(lines) + '\n')
+            os.chmod(tmp_path, 0o644)
+            os.rename(tmp_path, path)
+        except (IOError, OSError) as error:
+            self._display.warning('Could not write the OVH API stats to %s: %s' % (path, error))
@@ -0,0 +1,140 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+name: ovh
+short_description: HttpApi plugin for the OVH API
+description:
+    - Sends the API requests of the mgdis.ovh modules through the ansible.netcommon.httpapi persistent connection.
+    - Requests are signed with the application and consumer keys of the connection. The delta between the local
+      and the API clocks is measured once per connection and measured again when the API rejects a timestamp.
+    - The connection, its keep-alive socket and its time delta outlive the tasks, the modules then skip
+      the credentials and the /auth/time call.
+requirements:
+    - ansible.netcommon
+options:
+    application_key:
+        description: The OVH application key.
+        type: str
+        env:
+            - name: OVH_APPLICATION_KEY
+        vars:
+            - name: ansible_httpapi_ovh_application_key
+    application_secret:
+        description: The OVH application secret.
+        type: str
+        env:
+            - name: OVH_APPLICATION_SECRET
+        vars:
+            - name: ansible_httpapi_ovh_application_secret
+    consumer_key:
+        description: The OVH consumer key.
+        type: str
+        env:
+            - name: OVH_CONSUMER_KEY
+        vars:
+            - name: ansible_httpapi_ovh_consumer_key
+    root_path:
+        description: Path of the API on the host, e.g. C(/1.0) for C(eu.api.ovh.com).
+        type: str
+        default: /1.0
+        vars:
+            - name: ansible_httpapi_ovh_root_path
+'''
+
+import hashlib
+import json
+import time
+
+from ansible.module_utils._text import to_text
+from ansible.plugins.httpapi import HttpApiBase
+
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import CLOCK_SKEW_ERRORS, account_hash
+
+
+class HttpApi(HttpApiBase):
+
+    def __init__(self, connection):
+        super(HttpApi, self).__init__(connection)
+        self._time_delta = None
+
+    def login(self, username, password):
+        # Every request is signed, there is no session to open
+        pass
+
+    def handle_httperror(self, exc):
+        # Error answers are returned to the modules, which report them
+        return exc
+
+    def api_url(self):
+        """Return the URL of the API, the modules key their cache on it.
+
+        Requests are signed over this URL, which must read like the one of
+        python-ovh: the connection URL always holds the port, the default
+        one is left out here.
+        """
+        use_ssl = self.connection.get_option('use_ssl')
+        netloc = self.connection.get_option('host')
+        port = self.connection.get_option('port')
+        if port and int(port) != (443 if use_ssl else 80):
+            netloc = '%s:%s' % (netloc, port)
+        return '%s://%s%s' % ('https' if use_ssl else 'http', netloc, self.get_option('root_path'))
+
+    def account(self):
+        """Return the hash of the keys of the connection, the modules keep their cache apart per account."""
+        return account_hash(self.get_option('application_key'), self.get_option('consumer_key'))
+
+    def _send(self, method, path, body, headers):
+        response, response_data = self.connection.send(
+            self.get_option('root_path') + path, body, method=method, headers=headers
+        )
+        return {
+            'status': response.getcode(),
+            'headers': dict(response.headers.items()),
+            'body': to_text(response_data.getvalue(), errors='surrogate_or_strict'),
+        }
+
+    def time_delta(self):
+        if self._time_delta is None:
+            reply = self._send('GET', '/auth/time', '', {'X-Ovh-Application': self.get_option('application_key')})
+            self._time_delta = int(reply['body']) - int(time.time())
+        return self._time_delta
+
+    def _signed_headers(self, method, path, body, headers):
+        now = str(int(time.time()) + self.time_delta())
+        signature = hashlib.sha1('+'.join([
+            self.get_option('application_secret'), self.get_option('consumer_key'), method.upper(),
+            self.api_url() + path, body, now
+        ]).encode('utf-8'))
+        headers = dict(headers)
+        headers['X-Ovh-Consumer'] = self.get_option('consumer_key')
+        headers['X-Ovh-Timestamp'] = now
+        headers['X-Ovh-Signature'] = '$1$' + signature.hexdigest()
+        return headers
+
+    def send_request(self, method, path, data=None, headers=None, need_auth=True):
+        """Send a request to the API.
+
+        :returns: a dict with the ``status``, ``headers`` and ``body`` of the
+            answer, error answers included
+        """
+        body = json.dumps(data, separators=(',', ':')) if data is not None else ''
+        headers = dict(headers or {})
+        headers['X-Ovh-Application'] = self.get_option('application_key')
+        if data is not None:
+            headers['Content-Type'] = 'application/json'
+        if not need_auth:
+            return self._send(method, path, body, headers)
+
+        reply = self._send(method, path, body, self._signed_headers(method, path, body, headers))
+        if reply['status'] == 400:
+            try:
+                clock_skew = json.loads(reply['body']).get('errorCode') in CLOCK_SKEW_ERRORS
+            except (ValueError, AttributeError):
+                clock_skew = False
+            if clock_skew:
+                # The API did not process the request, measure the delta again and send it once more
+                self._time_delta = None
+                reply = self._send(method, path, body, self._signed_headers(method, path, body, headers))
+        return reply
@@ -1,12 +1,1410 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import fcntl
+import hashlib
+import json
+import os
+import random
+import re
+import socket
+import tempfile
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from ansible.module_utils.basic import _load_params, env_fallback
+from ansible.module_utils.connection import Connection, ConnectionError
+from ansible.module_utils.six.moves.urllib.parse import quote, urlparse
+
 try:
     import ovh
-    from ovh.exceptions import APIError
+    from ovh.exceptions import APIError, ResourceNotFoundError
+    from requests import Response, Session
+    from requests.adapters import HTTPAdapter
+    from requests.exceptions import RequestException
+    from requests.structures import CaseInsensitiveDict
+    from urllib3.connection import HTTPConnection
     HAS_OVH = True
+    _BaseClient = ovh.Client
 except ImportError:
     HAS_OVH = False
+    _BaseClient = object
+
+# python-ovh < 1.0 does not give access to request headers
+HAS_RAW_CALL = hasattr(_BaseClient, 'raw_call')
+
+DEFAULT_CACHE_DIR = os.path.join('~', '.cache', 'mgdis.ovh')
+DEFAULT_CACHE_TTL = 300
+DEFAULT_API_WORKERS = 8
+# Number of ids requested at once with X-Ovh-Batch, keeps URLs well below
+# the usual 8KB limit even with 36 characters UUIDs.
+DEFAULT_BATCH_SIZE = 50
+BATCH_SEPARATOR = ','
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_TIME_DELTA_TTL = 3600
+DEFAULT_CATALOG_TTL = 86400
+# Errors returned by the API when a request timestamp is too far from its clock
+CLOCK_SKEW_ERRORS = ('QUERY_TIME_OUT', 'INVALID_SIGNATURE')
+IDEMPOTENT_METHODS = ['GET', 'PUT', 'DELETE']
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CASSETTE_MODES = ['record', 'replay']
+CASSETTE_TIMINGS = ['none', 'original']
+# Request headers telling apart calls on the same path, the others hold
+# credentials and signatures and are never recorded
+CASSETTE_REQUEST_HEADERS = ('X-Ovh-Batch', 'X-Pagination-Mode', 'X-Pagination-Size', 'X-Pagination-Cursor')
+CASSETTE_SKIPPED_HEADERS = ('Connection', 'Content-Encoding', 'Content-Length', 'Set-Cookie', 'Transfer-Encoding')
+DEFAULT_PROFILE_ALLOCATIONS = 25
+SECRET_KEYS = re.compile(r'(?i)password|secret|token|consumerkey|credential')
+DEFAULT_WAIT_TIMEOUT = 600
+# Fields telling apart the offers of /cloud/project/{serviceName}/database/availability
+DATABASE_OFFER_KEYS = ('engine', 'version', 'plan', 'region', 'flavor', 'network')
+
+
+def _cache_segment(value):
+    # Escape everything but a safe charset so that API paths (and user
+    # provided ids such as service names) can never escape the cache root.
+    value = re.sub(r'[^A-Za-z0-9._-]', lambda match: '%%%02X' % ord(match.group()), str(value))
+    if value in ('.', '..'):
+        value = value.replace('.', '%2E')
+    return value
+
+
+def account_hash(application_key, consumer_key):
+    """Return a short hash telling the API accounts apart without writing their keys."""
+    return hashlib.sha1(('%s:%s' % (application_key, consumer_key)).encode('utf-8')).hexdigest()[:16]
+
+
+def _read_json(path):
+    try:
+        with open(path) as cache_file:
+            return json.load(cache_file)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    directory = os.path.dirname(path)
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as cache_file:
+            json.dump(data, cache_file, separators=(',', ':'))
+        os.rename(tmp_path, path)
+    except (IOError, OSError):
+        # The cache is an optimisation only, never fail a task because of it
+        pass
+
+
+class OvhCache(object):
+    """Controller-local cache of OVH API listings.
+
+    Entries are JSON files stored under a directory tree mirroring the API
+    path, so that every task of a play (and every fork) shares them.
+    Listings are kept apart per ``account``, since two consumer keys of the
+    same endpoint may see different objects at the same path.
+    A ttl lower or equal to 0 disables the cache.
+    """
+
+    INDEX_PREFIX = 'index'
+    CATALOG_NAME = 'catalog.json'
+
+    def __init__(self, directory, ttl, namespace, account=None):
+        self.root = os.path.join(os.path.expanduser(directory), _cache_segment(namespace))
+        self.ttl = ttl
+        self.account = account
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def _directory(self, api_path):
+        segments = [_cache_segment(segment) for segment in api_path.split('?')[0].split('/') if segment]
+        if self.account:
+            segments.insert(0, _cache_segment(self.account))
+        return os.path.join(self.root, *segments)
+
+    def _index_path(self, api_path, region=None):
+        name = self.INDEX_PREFIX
+        if region:
+            name = '%s-%s' % (name, _cache_segment(region))
+        return os.path.join(self._directory(api_path), name + '.json')
+
+    def load(self, name, ttl):
+        """Return the entry stored as ``name`` at the cache root if younger than ``ttl``."""
+        if ttl <= 0:
+            return None
+        entry = _read_json(os.path.join(self.root, name))
+        if not entry or time.time() - entry.get('timestamp', 0) > ttl:
+            return None
+        return entry
+
+    def store(self, name, entry):
+        entry.setdefault('timestamp', time.time())
+        _write_json(os.path.join(self.root, name), entry)
+
+    def drop(self, name):
+        try:
+            os.remove(os.path.join(self.root, name))
+        except OSError:
+            pass
+
+    def load_index(self, api_path, region=None):
+        if not self.enabled:
+            return None
+        entry = _read_json(self._index_path(api_path, region))
+        if not entry or time.time() - entry.get('timestamp', 0) > self.ttl:
+            return None
+        return entry
+
+    def store_index(self, api_path, entry, region=None):
+        if self.enabled:
+            _write_json(self._index_path(api_path, region), entry)
+
+    def load_catalog(self, api_path, ttl):
+        """Return the catalog entry of ``api_path`` if younger than ``ttl``, whatever the cache ttl."""
+        if ttl <= 0:
+            return None
+        entry = _read_json(os.path.join(self._directory(api_path), self.CATALOG_NAME))
+        if not entry or time.time() - entry.get('timestamp', 0) > ttl:
+            return None
+        return entry
+
+    def store_catalog(self, api_path, entry):
+        entry.setdefault('timestamp', time.time())
+        _write_json(os.path.join(self._directory(api_path), self.CATALOG_NAME), entry)
+
+    def invalidate(self, api_path):
+        """Drop the indexes a write on ``api_path`` may have made stale.
+
+        Names are only changed by creations (POST on the collection),
+        updates and deletions (PUT/DELETE on a collection item), so the
+        indexes of the path itself and of its parent are removed.
+        """
+        directory = self._directory(api_path)
+        for target in (directory, os.path.dirname(directory)):
+            if not target.startswith(self.root + os.sep):
+                continue
+            try:
+                names = os.listdir(target)
+            except OSError:
+                continue
+            for name in names:
+                if name.startswith(self.INDEX_PREFIX) and name.endswith('.json'):
+                    try:
+                        os.remove(os.path.join(target, name))
+                    except OSError:
+                        pass
+
+
+def fetch_concurrently(fetch, items, max_workers=DEFAULT_API_WORKERS, stop=None):
+    """Call ``fetch`` on every item using at most ``max_workers`` threads.
+
+    Returns a dict mapping each fetched item to its result. When ``stop`` is
+    given, no new fetch is started once ``stop(item, result)`` returns True,
+    so only the calls already in flight complete after the first match.
+    Exceptions raised by ``fetch`` are propagated.
+    """
+    results = {}
+    pending = iter(items)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        running = {}
+
+        def submit_next():
+            for item in pending:
+                running[executor.submit(fetch, item)] = item
+                return True
+            return False
+
+        while len(running) < max(1, max_workers) and submit_next():
+            pass
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = running.pop(future)
+                results[item] = future.result()
+                if stop is not None and stop(item, results[item]):
+                    pending = iter(())
+                else:
+                    submit_next()
+    return results
+
+
+def pooled_session(pool_size, keepalive=True, compression=True):
+    """Return a requests session tuned for many concurrent calls to one endpoint.
+
+    The connection pool holds up to ``pool_size`` connections, so that
+    every thread of :func:`fetch_concurrently` reuses an open TLS
+    connection instead of handshaking again.
+    """
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    socket_options = list(HTTPConnection.default_socket_options)
+    if keepalive:
+        socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    adapter.init_poolmanager(1, pool_size, socket_options=socket_options)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    session.headers['Connection'] = 'keep-alive' if keepalive else 'close'
+    session.headers['Accept-Encoding'] = 'gzip, deflate' if compression else 'identity'
+    return session
+
+
+def _retry_after(response, default=1.0):
+    try:
+        return max(float(response.headers.get('Retry-After')), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class RetryPolicy(object):
+    """When and how long to wait before sending a failed request again.
+
+    Connection errors, 429 and 5xx answers are retried up to ``retries``
+    times for the given ``methods``, with an exponential backoff starting
+    at ``backoff`` seconds and capped to ``max_delay``. ``jitter`` is the
+    fraction of each delay which is randomized, so that forks failing
+    together do not retry together. A Retry-After header is a minimum.
+    """
+
+    def __init__(self, retries=3, backoff=0.5, max_delay=30.0, jitter=1.0, methods=None):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.methods = [method.upper() for method in (methods or IDEMPOTENT_METHODS)]
+
+    def allows(self, method, attempt):
+        return attempt < self.retries and method.upper() in self.methods
+
+    def delay(self, attempt, response=None):
+        delay = min(self.max_delay, self.backoff * (2 ** attempt))
+        delay -= random.uniform(0, delay * self.jitter)
+        if response is not None:
+            delay = max(delay, _retry_after(response, default=0.0))
+        return delay
+
+
+class RateLimiter(object):
+    """Request budget shared by every process of the controller.
+
+    Implements a token bucket of ``burst`` requests refilled at ``rate``
+    requests per second, as a generic cell rate algorithm: the state is a
+    single "theoretical arrival time" kept in a file locked with flock, so
+    that concurrent forks reserve their slot atomically then sleep without
+    holding the lock.
+    """
+
+    def __init__(self, path, rate, burst=None):
+        self.path = path
+        self.interval = 1.0 / rate
+        self.tolerance = (max(burst or int(rate), 1) - 1) * self.interval
+
+    def _update(self, update):
+        directory = os.path.dirname(self.path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        with open(self.path, 'a+') as state:
+            fcntl.flock(state, fcntl.LOCK_EX)
+            try:
+                state.seek(0)
+                try:
+                    tat = float(state.read() or 0)
+                except ValueError:
+                    tat = 0.0
+                tat, result = update(tat, time.time())
+                state.seek(0)
+                state.truncate()
+                state.write(repr(tat))
+                state.flush()
+                return result
+            finally:
+                fcntl.flock(state, fcntl.LOCK_UN)
+
+    def acquire(self):
+        """Wait until the shared budget allows one more request."""
+        def reserve(tat, now):
+            tat = max(tat, now)
+            return tat + self.interval, max(tat - self.tolerance - now, 0.0)
+
+        try:
+            delay = self._update(reserve)
+        except (IOError, OSError):
+            return
+        if delay > 0:
+            time.sleep(delay)
+
+    def penalize(self, delay):
+        """Hold every process back for ``delay`` seconds, e.g. after a 429."""
+        try:
+            self._update(lambda tat, now: (max(tat, now + delay + self.tolerance), None))
+        except (IOError, OSError):
+            pass
+
+
+class SingleFlight(object):
+    """Identical GET requests sent at once by the processes of the controller.
+
+    The first process sending a request holds an exclusive flock on a file
+    named after the request signature until the answer comes, then writes
+    the answer into that file. The processes sending the same request in
+    the meantime wait for the lock and read the answer instead of calling
+    the API. An answer is only reused by the requests sent while it was in
+    flight, so no older answer is ever served, whatever the cache ttl: the
+    file is removed as soon as the answer is written, the waiters read it
+    from the file they opened.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @staticmethod
+    def _answer(flight, since):
+        flight.seek(0)
+        try:
+            answer = json.loads(flight.read())
+        except ValueError:
+            return None
+        if not isinstance(answer, dict) or answer.get('timestamp', 0) < since:
+            return None
+        return answer
+
+    @staticmethod
+    def _store(flight, response):
+        answer = json.dumps({
+            'timestamp': time.time(),
+            'status': response.status_code,
+            'headers': dict(
+                (name, value) for name, value in response.headers.items() if name not in CASSETTE_SKIPPED_HEADERS
+            ),
+            'body': response.text,
+        })
+        try:
+            flight.seek(0)
+            flight.truncate()
+            flight.write(answer)
+            flight.flush()
+        except (IOError, OSError):
+            pass
+
+    @staticmethod
+    def _discard(flight, path):
+        # Another process may already fly the same request in a new file
+        try:
+            if os.fstat(flight.fileno()).st_ino == os.stat(path).st_ino:
+                os.remove(path)
+        except (IOError, OSError):
+            pass
+
+    def run(self, url, signature, fetch):
+        """Return the answer of ``fetch()`` and whether another process fetched it.
+
+        :param signature: string telling apart the requests which get the
+            same answer
+        """
+        since = time.time()
+        path = os.path.join(self.directory, hashlib.sha1(signature.encode('utf-8')).hexdigest())
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory, 0o700)
+            flight = open(path, 'a+')
+        except (IOError, OSError):
+            return fetch(), False
+
+        with flight:
+            try:
+                fcntl.flock(flight, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except (IOError, OSError):
+                # The request is in flight: wait for its answer
+                fcntl.flock(flight, fcntl.LOCK_SH)
+                try:
+                    answer = self._answer(flight, since)
+                finally:
+                    fcntl.flock(flight, fcntl.LOCK_UN)
+                if answer is not None:
+                    return _response(url, answer['status'], answer['headers'], answer['body']), True
+                # The request failed, send it again
+                fcntl.flock(flight, fcntl.LOCK_EX)
+            try:
+                answer = self._answer(flight, since)
+                if answer is not None:
+                    return _response(url, answer['status'], answer['headers'], answer['body']), True
+                response = fetch()
+                self._store(flight, response)
+                return response, False
+            finally:
+                self._discard(flight, path)
+                fcntl.flock(flight, fcntl.LOCK_UN)
+
+
+def _append_line(path, line):
+    """Append ``line`` to ``path`` under an exclusive flock, shared by concurrent tasks."""
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory, 0o700)
+    with open(path, 'a') as stream:
+        fcntl.flock(stream, fcntl.LOCK_EX)
+        try:
+            stream.write(line + '\n')
+        finally:
+            fcntl.flock(stream, fcntl.LOCK_UN)
+
+
+def path_template(path):
+    """Return ``path`` without its query string and with ids replaced by ``{id}``.
+
+    API route segments are plain words (``instance``, ``ipRestriction``...)
+    while ids, service names, zones or IPs contain digits, dots or escapes.
+    """
+    return '/'.join(
+        segment if re.match(r'^[A-Za-z]*$', segment) else '{id}'
+        for segment in path.split('?')[0].split('/')
+    )
+
+
+class SpanTracer(object):
+    """Append one JSON line per API request or cache lookup to ``path``.
+
+    Lines of every task of a play go to the same file, tied together by
+    ``trace_id`` and told apart by ``task_id`` and ``module``.
+    """
+
+    def __init__(self, path, trace_id, task_id, module):
+        self.path = os.path.expanduser(path)
+        self.context = {'trace_id': trace_id, 'task_id': task_id, 'module': module}
+
+    def span(self, **fields):
+        fields.update(self.context, timestamp=round(time.time(), 6))
+        try:
+            _append_line(self.path, json.dumps(fields, sort_keys=True))
+        except (IOError, OSError):
+            pass
+
+
+class ApiStats(object):
+    """Record of every HTTP request sent by a client and of its cache lookups."""
+
+    def __init__(self, tracer=None):
+        self.requests = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.shared = 0
+        self.tracer = tracer
+        self._missed = set()
+
+    def record(self, method, path, status, size, latency, attempt=0):
+        template = path_template(path)
+        self.requests.append({
+            'method': method.upper(),
+            'path': template,
+            'status': status,
+            'bytes': size,
+            'time': latency,
+            'retry': attempt,
+        })
+        if self.tracer is not None:
+            # A request following a cache miss on its path is the miss
+            cache = None
+            if method.upper() == 'GET' and template in self._missed:
+                self._missed.discard(template)
+                cache = 'miss'
+            self.tracer.span(method=method.upper(), path=template, status=status, bytes=size,
+                             latency=round(latency, 6), retry=attempt, cache=cache)
+
+    def lookup(self, path, hit):
+        """Record a lookup of the data of ``path`` in the controller cache."""
+        if hit:
+            self.cache_hits += 1
+            if self.tracer is not None:
+                self.tracer.span(method='GET', path=path_template(path), status=None, bytes=0, latency=0.0,
+                                 retry=0, cache='hit')
+        else:
+            self.cache_misses += 1
+            self._missed.add(path_template(path))
+
+    def share(self, path):
+        """Record a request answered by the same request of another process."""
+        self.shared += 1
+        if self.tracer is not None:
+            self.tracer.span(method='GET', path=path_template(path), status=None, bytes=0, latency=0.0,
+                             retry=0, cache='shared')
+
+    def summary(self):
+        endpoints = {}
+        for request in self.requests:
+            endpoint = endpoints.setdefault('%s %s' % (request['method'], request['path']), {
+                'calls': 0, 'time': 0.0, 'max_time': 0.0, 'bytes': 0, 'errors': 0, 'latencies': []
+            })
+            endpoint['calls'] += 1
+            endpoint['time'] += request['time']
+            endpoint['max_time'] = max(endpoint['max_time'], request['time'])
+            endpoint['bytes'] += request['bytes']
+            endpoint['errors'] += 0 if 200 <= request['status'] < 300 else 1
+            endpoint['latencies'].append(round(request['time'], 4))
+        for endpoint in endpoints.values():
+            endpoint['time'] = round(endpoint['time'], 4)
+            endpoint['max_time'] = round(endpoint['max_time'], 4)
+
+        slowest = max(self.requests, key=lambda request: request['time']) if self.requests else None
+        return {
+            'calls': len(self.requests),
+            'total_time': round(sum(request['time'] for request in self.requests), 4),
+            'bytes': sum(request['bytes'] for request in self.requests),
+            'retries': sum(1 for request in self.requests if request['retry']),
+            'slowest': dict(slowest, time=round(slowest['time'], 4)) if slowest else None,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'shared': self.shared,
+            'endpoints': endpoints,
+        }
+
+
+def _scrub(value):
+    """Return ``value`` with the values of secret looking keys masked."""
+    if isinstance(value, dict):
+        return dict(
+            (key, '********' if SECRET_KEYS.search(key) and value[key] is not None else _scrub(value[key]))
+            for key in value
+        )
+    if isinstance(value, list):
+        return [_scrub(item) for item in value]
+    return value
+
+
+def _response(url, status, headers, body):
+    """Build a requests Response from an answer which did not come from requests."""
+    response = Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = 'utf-8'
+    response._content = body.encode('utf-8')
+    response.url = url
+    return response
+
+
+class OvhCassette(object):
+    """Recorded API requests and responses, to replay a workload offline.
+
+    Interactions are appended as JSON lines to ``path`` under an exclusive
+    flock, so every task of a play can record into the same cassette.
+    Credentials, signatures and secret looking values are not recorded.
+    In replay mode, each request gets the next recorded response for the
+    same method, path, body and pagination or batch headers; the last one
+    is served again once they are exhausted, e.g. while polling.
+
+    :param mode: ``record`` or ``replay``
+    :param timing: ``original`` replays the recorded latencies, ``none``
+        answers at once
+    """
+
+    def __init__(self, path, mode='replay', timing='none'):
+        self.path = os.path.expanduser(path)
+        self.mode = mode
+        self.timing = timing
+        self._responses = {}
+        if mode == 'replay':
+            with open(self.path) as cassette:
+                for line in cassette:
+                    if line.strip():
+                        interaction = json.loads(line)
+                        self._responses.setdefault(self._key(**interaction['request']), []).append(interaction)
+
+    @staticmethod
+    def _key(method, path, body=None, headers=None):
+        return json.dumps([method.upper(), path, body, headers or {}], sort_keys=True)
+
+    @staticmethod
+    def _request(method, path, data, headers):
+        headers = headers or {}
+        return {
+            'method': method.upper(),
+            'path': path,
+            'body': _scrub(data),
+            'headers': dict((name, headers[name]) for name in CASSETTE_REQUEST_HEADERS if name in headers),
+        }
+
+    def record(self, method, path, data, headers, response, latency):
+        try:
+            body = json.dumps(_scrub(response.json()))
+        except ValueError:
+            body = response.text
+        line = json.dumps({
+            'request': self._request(method, path, data, headers),
+            'response': {
+                'status': response.status_code,
+                'headers': dict(
+                    (name, value) for name, value in response.headers.items() if name not in CASSETTE_SKIPPED_HEADERS
+                ),
+                'body': body,
+            },
+            'latency': round(latency, 4),
+        }, sort_keys=True)
+        _append_line(self.path, line)
+
+    def replay(self, method, path, data, headers):
+        """Return the recorded response of a request as a requests Response."""
+        interactions = self._responses.get(self._key(**self._request(method, path, data, headers)))
+        if not interactions:
+            raise APIError('No response recorded in {0} for {1} {2}'.format(self.path, method.upper(), path))
+        interaction = interactions.pop(0) if len(interactions) > 1 else interactions[0]
+        if self.timing == 'original':
+            time.sleep(interaction['latency'])
+
+        return _response(path, **interaction['response'])
+
+
+def _is_clock_skew(api_error):
+    response = getattr(api_error, 'response', None)
+    if response is None or response.status_code != 400:
+        return False
+    try:
+        return response.json().get('errorCode') in CLOCK_SKEW_ERRORS
+    except (ValueError, AttributeError):
+        return False
+
+
+class OvhClient(_BaseClient):
+    """ovh.Client keeping the controller-local cache in sync with writes."""
+
+    TIME_DELTA_ENTRY = 'time_delta.json'
+
+    def __init__(self, cache=None, max_workers=DEFAULT_API_WORKERS, page_size=DEFAULT_PAGE_SIZE,
+                 time_delta_ttl=DEFAULT_TIME_DELTA_TTL, **kwargs):
+        # python-ovh only knows the named endpoints, an URL points the client
+        # at another API, e.g. a local fake one
+        endpoint_url = kwargs.get('endpoint')
+        if endpoint_url and re.match(r'^https?://', endpoint_url):
+            kwargs['endpoint'] = 'ovh-eu'
+        else:
+            endpoint_url = None
+        super(OvhClient, self).__init__(**kwargs)
+        if endpoint_url:
+            self._endpoint = endpoint_url.rstrip('/')
+        self.cache = cache
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.time_delta_ttl = time_delta_ttl
+        self.catalog_ttl = DEFAULT_CATALOG_TTL
+        self.rate_limiter = None
+        self.retry_policy = None
+        self.stats = ApiStats()
+        self.cassette = None
+        self.connection = None
+        self.single_flight = None
+
+        self._unbatched_routes = set()
+        self._unpaginated_routes = set()
+
+    @property
+    def time_delta(self):
+        """Delta between the local and the API clocks, shared by every task.
+
+        python-ovh calls /auth/time before the first signed request of each
+        client; the measured delta is kept in the cache for
+        ``time_delta_ttl`` seconds so that other tasks skip that call.
+        """
+        if self._time_delta is None and self.cache is not None:
+            entry = self.cache.load(self.TIME_DELTA_ENTRY, self.time_delta_ttl)
+            self.stats.lookup('/auth/time', entry is not None)
+            if entry is not None:
+                self._time_delta = entry['delta']
+            else:
+                self._time_delta = super(OvhClient, self).time_delta
+                if self.time_delta_ttl > 0:
+                    self.cache.store(self.TIME_DELTA_ENTRY, {'delta': self._time_delta})
+        return super(OvhClient, self).time_delta
+
+    def reset_time_delta(self):
+        self._time_delta = None
+        if self.cache is not None:
+            self.cache.drop(self.TIME_DELTA_ENTRY)
+
+    def raw_call(self, method, path, data=None, need_auth=True, headers=None):
+        if self.single_flight is None or method.upper() != 'GET':
+            return self._attempts(method, path, data, need_auth, headers)
+
+        headers = headers or {}
+        signature = json.dumps([
+            self._endpoint, self._application_key, self._consumer_key, path,
+            dict((name, headers[name]) for name in CASSETTE_REQUEST_HEADERS if name in headers)
+        ], sort_keys=True)
+        response, shared = self.single_flight.run(
+            self._endpoint + path, signature, lambda: self._attempts(method, path, data, need_auth, headers)
+        )
+        if shared:
+            self.stats.share(path)
+        return response
+
+    def _attempts(self, method, path, data, need_auth, headers):
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            start = time.time()
+            try:
+                response = self._send(method, path, data, need_auth, headers)
+            except RequestException:
+                self.stats.record(method, path, 0, 0, time.time() - start, attempt)
+                if self.retry_policy is None or not self.retry_policy.allows(method, attempt):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+            else:
+                self.stats.record(method, path, response.status_code, len(response.content), time.time() - start, attempt)
+                retry = response.status_code in RETRY_STATUSES and self.retry_policy is not None
+                retry = retry and self.retry_policy.allows(method, attempt)
+                if response.status_code == 429 and self.rate_limiter is not None:
+                    # The shared limiter makes every process, this one
+                    # included, wait before its next request.
+                    self.rate_limiter.penalize(
+                        self.retry_policy.delay(attempt, response) if retry else _retry_after(response)
+                    )
+                    delay = 0
+                elif retry:
+                    delay = self.retry_policy.delay(attempt, response)
+                if not retry:
+                    return response
+            attempt += 1
+            time.sleep(delay)
+
+    def _send(self, method, path, data, need_auth, headers):
+        if self.cassette is not None and self.cassette.mode == 'replay':
+            return self.cassette.replay(method, path, data, headers)
+        start = time.time()
+        if self.connection is not None:
+            response = self._connection_call(method, path, data, need_auth, headers)
+        else:
+            response = super(OvhClient, self).raw_call(method, path, data=data, need_auth=need_auth, headers=headers)
+        if self.cassette is not None:
+            self.cassette.record(method, path, data, headers, response, time.time() - start)
+        return response
+
+    def _connection_call(self, method, path, data, need_auth, headers):
+        # The mgdis.ovh.ovh httpapi plugin signs the request and keeps the
+        # time delta on the persistent connection
+        try:
+            answer = self.connection.send_request(method, path, data=data, headers=headers, need_auth=need_auth)
+        except ConnectionError as connection_error:
+            raise RequestException(str(connection_error))
+        return _response(self._endpoint + path, **answer)
+
+    def call(self, method, path, data=None, need_auth=True):
+        try:
+            try:
+                return super(OvhClient, self).call(method, path, data, need_auth)
+            except APIError as api_error:
+                # A cached time delta may have drifted: measure it again
+                # and replay the request, which the API did not process.
+                # The httpapi plugin already does so with its own delta.
+                if not need_auth or self.connection is not None or not _is_clock_skew(api_error):
+                    raise
+                self.reset_time_delta()
+                return super(OvhClient, self).call(method, path, data, need_auth)
+        finally:
+            if method.upper() != 'GET' and self.cache is not None:
+                self.cache.invalidate(path)
+
+    def _batch_get(self, path, ids):
+        """GET several items of ``path`` in one call, None if the route refuses it."""
+        if not HAS_RAW_CALL:
+            return None
+        target = '%s/%s' % (path, BATCH_SEPARATOR.join(quote(str(object_id), safe='') for object_id in ids))
+        try:
+            response = self.raw_call('GET', target, headers={'X-Ovh-Batch': BATCH_SEPARATOR})
+        except RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        try:
+            items = response.json()
+        except ValueError:
+            return None
+        if not isinstance(items, list) or not all(isinstance(item, dict) and 'key' in item for item in items):
+            return None
+
+        results = {}
+        by_key = dict((str(object_id), object_id) for object_id in ids)
+        for item in items:
+            if not item.get('error') and str(item['key']) in by_key:
+                results[by_key[str(item['key'])]] = item.get('value')
+        return results
+
+    def get_many(self, path, ids, stop=None, chunk_size=DEFAULT_BATCH_SIZE):
+        """Return a dict mapping each id to the object ``GET path/<id>`` returns.
+
+        Ids are requested by chunks of ``chunk_size`` with the X-Ovh-Batch
+        header. Routes which do not support batching are remembered and
+        queried id by id, concurrently. Ids the API reports as failed in a
+        batch, or as not found when queried alone, are left out of the
+        result. When ``stop`` is given, no more ids are requested once
+        ``stop(id, object)`` returns True.
+        """
+        ids = list(ids)
+        results = {}
+        batchable = all(BATCH_SEPARATOR not in str(object_id) for object_id in ids)
+        if len(ids) > 1 and batchable and path not in self._unbatched_routes:
+            for start in range(0, len(ids), chunk_size):
+                chunk = self._batch_get(path, ids[start:start + chunk_size])
+                if chunk is None:
+                    self._unbatched_routes.add(path)
+                    break
+                results.update(chunk)
+                if stop is not None and any(stop(object_id, obj) for object_id, obj in chunk.items()):
+                    return results
+            else:
+                return results
+
+        def fetch(object_id):
+            try:
+                return self.get('%s/%s' % (path, object_id))
+            except ResourceNotFoundError:
+                return None
+
+        found = fetch_concurrently(
+            fetch,
+            [object_id for object_id in ids if object_id not in results],
+            max_workers=self.max_workers,
+            stop=None if stop is None else lambda object_id, obj: obj is not None and stop(object_id, obj)
+        )
+        results.update((object_id, obj) for object_id, obj in found.items() if obj is not None)
+        return results
+
+    def _pages(self, target):
+        """Yield the pages of ``target`` listed in iceberg mode.
+
+        The first page is None when the route does not support it, and the
+        plain listing when the route ignored the pagination headers.
+        """
+        cursor = None
+        while True:
+            headers = {
+                'X-Pagination-Mode': 'CachedObjectList-Pages',
+                'X-Pagination-Size': str(self.page_size),
+            }
+            if cursor:
+                headers['X-Pagination-Cursor'] = cursor
+            try:
+                response = self.raw_call('GET', target, headers=headers)
+                page = response.json()
+            except (RequestException, ValueError):
+                if cursor is None:
+                    yield None
+                    return
+                raise
+            if not 200 <= response.status_code < 300:
+                if cursor is None:
+                    yield None
+                    return
+                raise APIError(page.get('message') if isinstance(page, dict) else page, response=response)
+            yield page
+            cursor = response.headers.get('X-Pagination-Cursor-Next')
+            if not cursor or not isinstance(page, list) or not all(isinstance(obj, dict) for obj in page):
+                return
+
+    def iter_objects(self, path, skip=(), stop=None, **params):
+        """Yield the full objects of the ``path`` listing.
+
+        Objects are streamed by pages of ``page_size`` with the iceberg
+        pagination mode. When a route only returns ids, they are fetched
+        by chunks with :meth:`get_many` instead, so stopping the iteration
+        early still saves the remaining calls; the ids of ``skip`` are then
+        yielded as is instead of being fetched. When ``stop`` is given, the
+        iteration ends with the first object for which ``stop(object)``
+        returns True, and the ids of its chunk are no longer fetched once it
+        is found.
+        """
+        target = path
+        if params:
+            target = '%s?%s' % (path, self._prepare_query_string(self._canonicalize_kwargs(params)))
+
+        ids = None
+        if HAS_RAW_CALL and path not in self._unpaginated_routes:
+            for page in self._pages(target):
+                if isinstance(page, list) and all(isinstance(obj, dict) for obj in page):
+                    for obj in page:
+                        yield obj
+                        if stop is not None and stop(obj):
+                            return
+                    continue
+                self._unpaginated_routes.add(path)
+                if isinstance(page, list):
+                    ids = page
+                break
+            else:
+                return
+
+        if ids is None:
+            ids = self.get(target)
+        for start in range(0, len(ids), DEFAULT_BATCH_SIZE):
+            chunk = ids[start:start + DEFAULT_BATCH_SIZE]
+            objects = self.get_many(
+                path, [object_id for object_id in chunk if object_id not in skip],
+                stop=None if stop is None else lambda object_id, obj: stop(obj)
+            )
+            for object_id in chunk:
+                if object_id in skip:
+                    yield object_id
+                elif object_id in objects:
+                    yield objects[object_id]
+                    if stop is not None and stop(objects[object_id]):
+                        return
+
+
+class OvhResolver(object):
+    """Resolve OVH object names to ids.
+
+    Each listing below ``base_path`` (e.g. ``/cloud/project/<id>``) is turned
+    into a ``name -> id`` index, kept in the client cache per region.
+    Unknown names are remembered too, so repeated lookups of a missing
+    object do not list the collection again until the ttl expires or the
+    collection is written to.
+    """
+
+    def __init__(self, client, base_path):
+        self.client = client
+        self.base_path = base_path.rstrip('/')
+        self._objects = {}
+
+    def _path(self, kind):
+        return '%s/%s' % (self.base_path, kind)
+
+    @staticmethod
+    def _name(obj, key):
+        if isinstance(obj, dict):
+            return key(obj) if callable(key) else obj.get(key)
+        return obj
+
+    def _build_index(self, kind, region, key, details, wanted=None, previous=None, keep=()):
+        path = self._path(kind)
+        params = {'region': region} if region else {}
+        names = {}
+        if not details:
+            for obj in self.client.get(path, **params):
+                names.setdefault(self._name(obj, key), obj.get('id') if isinstance(obj, dict) else obj)
+            return {'timestamp': time.time(), 'names': names, 'missing': {}, 'complete': True}
+
+        # Listings of ids: stream the full objects and stop at the wanted one.
+        # When the route only lists ids, those a previous partial index
+        # already named are not fetched again.
+        known = dict((object_id, name) for name, object_id in previous['names'].items()) if previous else {}
+
+        def found(obj):
+            return wanted is not None and self._name(obj, key) == wanted
+
+        complete = True
+        for obj in self.client.iter_objects(path, skip=known, stop=found, **params):
+            if isinstance(obj, dict):
+                name, object_id = self._name(obj, key), obj.get('id')
+            else:
+                name, object_id = known[obj], obj
+            names.setdefault(name, object_id)
+            if isinstance(obj, dict) and (name == wanted or name in keep):
+                self._objects[(kind, object_id)] = obj
+            if wanted is not None and name == wanted:
+                complete = False
+                break
+        return {'timestamp': time.time(), 'names': names, 'missing': {}, 'complete': complete}
+
+    def _cache(self):
+        return getattr(self.client, 'cache', None)
+
+    def _lookup(self, path, hit):
+        stats = getattr(self.client, 'stats', None)
+        if stats is not None:
+            stats.lookup(path, hit)
+
+    def index(self, kind, region=None, key='name', details=False, wanted=(), verify=False, refresh=False):
+        """Return the ``name -> id`` index of a collection.
+
+        :param wanted: names whose objects are kept when the listing streams
+            them, available with :meth:`fetched`
+        :param verify: for modules creating the missing objects: a cached
+            index missing one of the ``wanted`` names is listed again
+        :param refresh: list the collection again whatever the cache
+        """
+        cache = self._cache()
+        entry = cache.load_index(self._path(kind), region) if cache and not refresh else None
+        complete = entry is not None and entry.get('complete')
+        if complete and verify:
+            complete = all(name in entry['names'] for name in wanted)
+        if cache:
+            self._lookup(self._path(kind), complete)
+        if not complete:
+            entry = self._build_index(kind, region, key, details, previous=entry, keep=set(wanted))
+            if cache:
+                cache.store_index(self._path(kind), entry, region)
+        return entry['names']
+
+    def _exists(self, kind, object_id):
+        try:
+            obj = self.client.get('%s/%s' % (self._path(kind), object_id))
+        except ResourceNotFoundError:
+            return False
+        if isinstance(obj, dict):
+            self._objects[(kind, object_id)] = obj
+        return True
+
+    def resolve(self, kind, name, region=None, key='name', details=False, verify=False, relist_missing=None):
+        """Return the id of the object named ``name`` or None if it does not exist.
+
+        :param kind: collection path relative to the resolver base path
+        :param region: region used to filter the listing, if any
+        :param key: attribute holding the name, or a callable extracting it
+        :param details: fetch each listed id when the listing only returns ids
+        :param verify: for modules using the object itself rather than its
+            id: an id found in the cache is fetched, and the collection
+            listed again when it no longer exists, e.g. deleted and created
+            again by another controller. The fetched object is then
+            available with :meth:`fetched`.
+        :param relist_missing: look a name cached as missing up again, for
+            modules creating the missing object; defaults to ``verify``
+        """
+        if relist_missing is None:
+            relist_missing = verify
+        cache = self._cache()
+        path = self._path(kind)
+        entry = cache.load_index(path, region) if cache else None
+        if entry is not None:
+            if name in entry['names']:
+                if not verify or self._exists(kind, entry['names'][name]):
+                    self._lookup(path, True)
+                    return entry['names'][name]
+                # The cached id is stale, list the collection from scratch
+                entry = None
+            else:
+                missing_since = entry['missing'].get(name)
+                if not relist_missing and missing_since is not None and time.time() - missing_since <= cache.ttl:
+                    self._lookup(path, True)
+                    return None
+        if cache:
+            self._lookup(path, False)
+
+        previous = entry
+        entry = self._build_index(kind, region, key, details, wanted=name, previous=previous)
+        if previous is not None:
+            entry['missing'].update(
+                (missing, since) for missing, since in previous['missing'].items() if missing not in entry['names']
+            )
+        if name not in entry['names']:
+            entry['missing'][name] = time.time()
+        if cache:
+            cache.store_index(path, entry, region)
+        return entry['names'].get(name)
+
+    def objects(self, kind, names, region=None, key='name', details=False, relist_missing=False):
+        """Return a dict mapping each of ``names`` to its object, the names which do not exist are left out.
+
+        Objects streamed while listing the collection are reused, the others
+        are fetched together with :meth:`OvhClient.get_many`. When an id of
+        a cached index no longer exists, e.g. deleted and created again by
+        another controller, the collection is listed again once.
+
+        :param relist_missing: list the collection again when a cached index
+            misses one of ``names``, for modules creating the missing objects
+        """
+        for refresh in (False, True):
+            index = self.index(kind, region, key, details, wanted=names, verify=relist_missing, refresh=refresh)
+            ids = dict((name, index[name]) for name in names if name in index)
+            found = dict(
+                (object_id, self.fetched(kind, object_id)) for object_id in ids.values() if self.fetched(kind, object_id)
+            )
+            found.update(self.client.get_many(self._path(kind), [object_id for object_id in ids.values() if object_id not in found]))
+            if all(object_id in found for object_id in ids.values()):
+                break
+        return dict((name, found[object_id]) for name, object_id in ids.items() if object_id in found)
+
+    def fetched(self, kind, object_id):
+        """Return the object ``object_id`` of ``kind`` if a lookup of its name fetched it, None otherwise."""
+        return self._objects.get((kind, object_id))
+
+    def database_clusters(self, db_type, wanted=(), verify=False):
+        """Return the ``description -> id`` index of the ``db_type`` clusters."""
+        return self.index('database/%s' % db_type, key='description', details=True, wanted=wanted, verify=verify)
+
+    def database_cluster(self, db_type, name, verify=False, relist_missing=None):
+        """Return the id of the ``db_type`` cluster described as ``name``."""
+        return self.resolve('database/%s' % db_type, name, key='description', details=True, verify=verify,
+                            relist_missing=relist_missing)
+
+    def database_cluster_objects(self, db_type, names, relist_missing=False):
+        """Return the ``db_type`` clusters described as ``names``, see :meth:`objects`."""
+        return self.objects('database/%s' % db_type, names, key='description', details=True, relist_missing=relist_missing)
+
+
+class DatabaseOffers(object):
+    """Database availability of a project, indexed by engine, version, plan, region, flavor and network.
+
+    Offers are looked up in one step whatever their number, the fields are
+    compared case insensitively.
+    """
+
+    def __init__(self, availability):
+        self._offers = {}
+        for offer in availability:
+            self._offers.setdefault(self.key(offer), offer)
+
+    @staticmethod
+    def key(criteria):
+        return tuple(str(criteria.get(name) or '').casefold() for name in DATABASE_OFFER_KEYS)
+
+    @staticmethod
+    def describe(criteria):
+        return ', '.join('%s: %s' % (name, criteria.get(name)) for name in DATABASE_OFFER_KEYS)
+
+    def find(self, criteria):
+        """Return the offer matching ``criteria``, None if there is none."""
+        return self._offers.get(self.key(criteria))
+
+    def nearest(self, criteria, count=5):
+        """Return the ``count`` offers sharing the most fields with ``criteria``.
+
+        On a tie, offers matching the first fields of DATABASE_OFFER_KEYS
+        (engine, then version...) come first.
+        """
+        wanted = self.key(criteria)
+
+        def distance(key):
+            mismatches = tuple(field != expected for field, expected in zip(key, wanted))
+            return sum(mismatches), mismatches, key
+
+        return [self._offers[key] for key in sorted(self._offers, key=distance)[:count]]
+
+
+def _compact(value):
+    """Return ``value`` with its lists of objects stored as field names and rows of values.
+
+    Fields missing from some objects of a list come back as None.
+    """
+    if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+        fields = sorted(set(key for item in value for key in item))
+        return {'_fields': fields, '_rows': [[_compact(item.get(field)) for field in fields] for item in value]}
+    if isinstance(value, dict):
+        return dict((key, _compact(item)) for key, item in value.items())
+    return value
+
+
+def _expand(value):
+    """Reverse :func:`_compact`."""
+    if isinstance(value, dict):
+        if set(value) == set(['_fields', '_rows']):
+            return [dict(zip(value['_fields'], [_expand(item) for item in row])) for row in value['_rows']]
+        return dict((key, _expand(item)) for key, item in value.items())
+    return value
+
+
+class DatabaseCatalog(object):
+    """Database availability and capabilities of a project, kept on the controller.
+
+    Both payloads are large and seldom change: they are stored per project
+    in the cache directory for ``client.catalog_ttl`` seconds, in a compact
+    form holding the field names of each list once.
+    """
+
+    def __init__(self, client, service_name):
+        self.client = client
+        self.path = '/cloud/project/%s/database' % service_name
+
+    def _load(self, name, refresh=False):
+        api_path = '%s/%s' % (self.path, name)
+        cache = self.client.cache
+        ttl = self.client.catalog_ttl
+        if cache is not None and not refresh:
+            entry = cache.load_catalog(api_path, ttl)
+            self.client.stats.lookup(api_path, entry is not None)
+            if entry is not None:
+                return _expand(entry['data'])
+
+        data = self.client.get(api_path)
+        if cache is not None and ttl > 0:
+            cache.store_catalog(api_path, {'data': _compact(data)})
+        return data
+
+    def availability(self, refresh=False):
+        """Return the DatabaseOffers of the project, downloaded again if ``refresh``."""
+        return DatabaseOffers(self._load('availability', refresh))
+
+    def capabilities(self, refresh=False):
+        return self._load('capabilities', refresh)
+
+
+class OvhWaitError(Exception):
+    """Raised when a resource does not reach the expected state in time."""
+
+    def __init__(self, msg, resource=None):
+        super(OvhWaitError, self).__init__(msg)
+        self.resource = resource
+
+
+def wait_for(fetch, predicate, timeout, delay=1.0, max_delay=15.0, factor=1.5):
+    """Poll ``fetch()`` until ``predicate(resource)`` is True and return the resource.
+
+    Polls start ``delay`` seconds apart and slow down by ``factor`` up to
+    ``max_delay`` while the resource stays the same; as soon as it changes
+    the next poll happens ``delay`` seconds later again. Raises
+    OvhWaitError once ``timeout`` seconds are elapsed.
+    """
+    deadline = time.time() + timeout
+    interval = delay
+    previous = None
+    while True:
+        resource = fetch()
+        if predicate(resource):
+            return resource
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise OvhWaitError('Timeout after {0} seconds'.format(timeout), resource)
+        interval = delay if resource != previous else min(interval * factor, max_delay)
+        previous = resource
+        time.sleep(min(interval, remaining))
+
+
+def get_or_none(client, path, **params):
+    """GET ``path``, None when the resource does not exist (anymore)."""
+    try:
+        return client.get(path, **params)
+    except ResourceNotFoundError:
+        return None
+
+
+def wait_for_status(client, path, statuses, timeout, failures=('ERROR',)):
+    """Wait for the resource at ``path`` to reach one of ``statuses``.
+
+    Statuses are compared case insensitively. ``None`` in ``statuses``
+    waits for the resource to be deleted. Reaching one of ``failures``
+    raises OvhWaitError right away.
+    """
+    expected = [status.upper() if status else status for status in statuses]
+    failed = [status.upper() for status in failures]
+
+    def status_of(resource):
+        return resource.get('status', '').upper() if resource is not None else None
+
+    def done(resource):
+        return status_of(resource) in expected or status_of(resource) in failed
+
+    resource = wait_for(lambda: get_or_none(client, path), done, timeout)
+    if status_of(resource) in failed:
+        raise OvhWaitError('{0} is in status {1}'.format(path, resource.get('status')), resource)
+    return resource
+
+
+def wait_for_statuses(client, path, ids, statuses, timeout, failures=('ERROR',)):
+    """Wait for the resources ``path/<id>`` of all ``ids`` to reach one of ``statuses``.
+
+    Like :func:`wait_for_status`, but the resources still pending are polled
+    together with :meth:`OvhClient.get_many`, so that resources created
+    without waiting are waited for at once. Returns a dict mapping each id
+    to its resource; OvhWaitError holds that dict as its resource.
+    """
+    expected = [status.upper() if status else status for status in statuses]
+    failed = [status.upper() for status in failures]
+    resources = {}
+    pending = set(ids)
+
+    def status_of(resource):
+        return resource.get('status', '').upper() if resource is not None else None
+
+    def fetch():
+        fetched = client.get_many(path, sorted(pending))
+        for object_id in list(pending):
+            resources[object_id] = fetched.get(object_id)
+            if status_of(resources[object_id]) in expected or status_of(resources[object_id]) in failed:
+                pending.discard(object_id)
+        return sorted((object_id, status_of(resource)) for object_id, resource in resources.items())
+
+    try:
+        wait_for(fetch, lambda _: not pending, timeout)
+    except OvhWaitError as wait_error:
+        raise OvhWaitError('{0}: {1} not ready'.format(wait_error, ', '.join(sorted(pending))), resources)
+    in_failure = sorted(object_id for object_id, resource in resources.items() if status_of(resource) in failed)
+    if in_failure:
+        raise OvhWaitError('{0} in status {1}'.format(
+            ', '.join('%s/%s' % (path, object_id) for object_id in in_failure),
+            ', '.join(sorted(set(resources[object_id].get('status') for object_id in in_failure)))
+        ), resources)
+    return resources
+
+
+def _module_params():
+    """Parameters of the running module, read before AnsibleModule parses them."""
+    try:
+        return _load_params() or {}
+    except (Exception, SystemExit):
+        return {}
+
+
+# Module name and task id of the running process
+_TASK = {}
+
+
+def ovh_task_id(params=None):
+    """Identifier of the running task: ``api_task_id``, OVH_TASK_ID or a random UUID."""
+    if 'id' not in _TASK:
+        params = _module_params() if params is None else params
+        _TASK['id'] = params.get('api_task_id') or os.environ.get('OVH_TASK_ID') or str(uuid.uuid4())
+    return _TASK['id']
+
+
+def ovh_profile(run, name):
+    """Call ``run``, profiled when ``api_profile_dir`` or OVH_PROFILE_DIR is set.
+
+    The cProfile statistics are written to ``<name>-<task id>.prof`` and the
+    peak and top allocations traced by tracemalloc to
+    ``<name>-<task id>.allocations.txt``, even when the module exits.
+    ``name`` is also the module name written in the traces.
+    """
+    _TASK['module'] = name
+    params = _module_params()
+    directory = params.get('api_profile_dir') or os.environ.get('OVH_PROFILE_DIR')
+    if not directory:
+        return run()
+
+    import cProfile
+    import tracemalloc
+
+    directory = os.path.expanduser(directory)
+    tag = '{0}-{1}'.format(name, ovh_task_id(params))
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        return run()
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0o700)
+            profiler.dump_stats(os.path.join(directory, tag + '.prof'))
+            with open(os.path.join(directory, tag + '.allocations.txt'), 'w') as allocations:
+                allocations.write('peak: {0} bytes, current: {1} bytes\n'.format(peak, current))
+                for statistic in snapshot.statistics('lineno')[:DEFAULT_PROFILE_ALLOCATIONS]:
+                    allocations.write('{0}\n'.format(statistic))
+        except (IOError, OSError):
+            pass
+
+
+def ovh_wait_argument_spec():
+    return dict(
+        wait=dict(type='bool', required=False, default=False),
+        wait_timeout=dict(type='int', required=False, default=DEFAULT_WAIT_TIMEOUT),
+    )
+
+
+def _report_api_stats(module, client):
+    """Add the ``api_stats`` summary of ``client`` to the results of ``module``."""
+    def with_stats(exit_function):
+        def report(*args, **kwargs):
+            kwargs['api_stats'] = client.stats.summary()
+            return exit_function(*args, **kwargs)
+        return report
+
+    module.exit_json = with_stats(module.exit_json)
+    module.fail_json = with_stats(module.fail_json)
 
 
 def ovh_api_connect(module):
@@ -22,14 +1420,89 @@ def ovh_api_connect(module):
     credential_parameters = [
         cred in module.params for cred in credential_keys]
     try:
-        if all(credential_parameters):
-            client = ovh.Client(
+        if getattr(module, '_socket_path', None):
+            # The httpapi plugin holds the credentials and signs the
+            # requests, python-ovh only insists on having some keys
+            connection = Connection(module._socket_path)
+            client = OvhClient(endpoint=connection.api_url(), application_key='httpapi', application_secret='httpapi')
+            client.connection = connection
+        elif all(credential_parameters):
+            client = OvhClient(
                 **{credential: module.params[credential] for credential in credential_keys})
         else:
-            client = ovh.Client()
-    except APIError as api_error:
+            client = OvhClient()
+        client.max_workers = module.params.get('api_workers') or DEFAULT_API_WORKERS
+        client.page_size = module.params.get('api_page_size') or DEFAULT_PAGE_SIZE
+        time_delta_ttl = module.params.get('time_delta_ttl')
+        if time_delta_ttl is not None:
+            client.time_delta_ttl = time_delta_ttl
+        catalog_ttl = module.params.get('catalog_ttl')
+        if catalog_ttl is not None:
+            client.catalog_ttl = catalog_ttl
+    except (APIError, ConnectionError) as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
+    client._session = pooled_session(
+        max(module.params.get('api_pool_size') or 0, client.max_workers),
+        keepalive=module.params.get('api_keepalive', True),
+        compression=module.params.get('api_compression', True)
+    )
+
+    cache_ttl = module.params.get('cache_ttl')
+    if cache_ttl is None:
+        cache_ttl = DEFAULT_CACHE_TTL
+    client.cache = OvhCache(
+        module.params.get('cache_dir') or DEFAULT_CACHE_DIR,
+        cache_ttl,
+        urlparse(client._endpoint).netloc,
+        account=client.connection.account() if client.connection else account_hash(
+            client._application_key, client._consumer_key
+        )
+    )
+
+    if module.params.get('api_rate_limit'):
+        client.rate_limiter = RateLimiter(
+            os.path.join(
+                client.cache.root,
+                'ratelimit-%s' % hashlib.sha1(str(client._application_key).encode('utf-8')).hexdigest()[:16]
+            ),
+            module.params['api_rate_limit'],
+            module.params.get('api_rate_burst')
+        )
+
+    if module.params.get('api_single_flight', True):
+        client.single_flight = SingleFlight(os.path.join(client.cache.root, 'flights'))
+
+    client.retry_policy = RetryPolicy(
+        retries=module.params.get('api_retries') or 0,
+        backoff=module.params.get('api_retry_backoff') or 0,
+        max_delay=module.params.get('api_retry_max_delay') or 0,
+        jitter=module.params.get('api_retry_jitter') or 0,
+        methods=module.params.get('api_retry_methods')
+    )
+
+    if module.params.get('api_stats'):
+        _report_api_stats(module, client)
+
+    if module.params.get('api_trace'):
+        task_id = ovh_task_id(module.params)
+        client.stats.tracer = SpanTracer(
+            module.params['api_trace'],
+            trace_id=module.params.get('api_trace_id') or task_id,
+            task_id=task_id,
+            module=_TASK.get('module') or module._name
+        )
+
+    if module.params.get('api_cassette'):
+        try:
+            client.cassette = OvhCassette(
+                module.params['api_cassette'],
+                mode=module.params.get('api_cassette_mode') or 'replay',
+                timing=module.params.get('api_cassette_timing') or 'none'
+            )
+        except (IOError, OSError, ValueError) as cassette_error:
+            module.fail_json(msg="Failed to load the API cassette: {0}".format(cassette_error))
+
     return client
 
 
@@ -39,4 +1512,32 @@ def ovh_argument_spec():
         application_key=dict(required=False, default=None),
         application_secret=dict(required=False, default=None),
         consumer_key=dict(required=False, default=None),
+        cache_dir=dict(type='path', required=False, default=None, fallback=(env_fallback, ['OVH_CACHE_DIR'])),
+        cache_ttl=dict(type='int', required=False, default=DEFAULT_CACHE_TTL, fallback=(env_fallback, ['OVH_CACHE_TTL'])),
+        api_workers=dict(type='int', required=False, default=DEFAULT_API_WORKERS, fallback=(env_fallback, ['OVH_API_WORKERS'])),
+        api_page_size=dict(type='int', required=False, default=DEFAULT_PAGE_SIZE, fallback=(env_fallback, ['OVH_API_PAGE_SIZE'])),
+        api_pool_size=dict(type='int', required=False, default=None, fallback=(env_fallback, ['OVH_API_POOL_SIZE'])),
+        api_keepalive=dict(type='bool', required=False, default=True, fallback=(env_fallback, ['OVH_API_KEEPALIVE'])),
+        api_compression=dict(type='bool', required=False, default=True, fallback=(env_fallback, ['OVH_API_COMPRESSION'])),
+        time_delta_ttl=dict(type='int', required=False, default=DEFAULT_TIME_DELTA_TTL, fallback=(env_fallback, ['OVH_TIME_DELTA_TTL'])),
+        catalog_ttl=dict(type='int', required=False, default=DEFAULT_CATALOG_TTL, fallback=(env_fallback, ['OVH_CATALOG_TTL'])),
+        api_single_flight=dict(type='bool', required=False, default=True, fallback=(env_fallback, ['OVH_API_SINGLE_FLIGHT'])),
+        api_rate_limit=dict(type='float', required=False, default=None, fallback=(env_fallback, ['OVH_API_RATE_LIMIT'])),
+        api_rate_burst=dict(type='int', required=False, default=None, fallback=(env_fallback, ['OVH_API_RATE_BURST'])),
+        api_retries=dict(type='int', required=False, default=3, fallback=(env_fallback, ['OVH_API_RETRIES'])),
+        api_retry_backoff=dict(type='float', required=False, default=0.5, fallback=(env_fallback, ['OVH_API_RETRY_BACKOFF'])),
+        api_retry_max_delay=dict(type='float', required=False, default=30.0, fallback=(env_fallback, ['OVH_API_RETRY_MAX_DELAY'])),
+        api_retry_jitter=dict(type='float', required=False, default=1.0, fallback=(env_fallback, ['OVH_API_RETRY_JITTER'])),
+        api_retry_methods=dict(type='list', elements='str', required=False, default=IDEMPOTENT_METHODS,
+                               fallback=(env_fallback, ['OVH_API_RETRY_METHODS'])),
+        api_stats=dict(type='bool', required=False, default=False, fallback=(env_fallback, ['OVH_API_STATS'])),
+        api_profile_dir=dict(type='path', required=False, fallback=(env_fallback, ['OVH_PROFILE_DIR'])),
+        api_task_id=dict(type='str', required=False, fallback=(env_fallback, ['OVH_TASK_ID'])),
+        api_trace=dict(type='path', required=False, fallback=(env_fallback, ['OVH_API_TRACE'])),
+        api_trace_id=dict(type='str', required=False, fallback=(env_fallback, ['OVH_TRACE_ID'])),
+        api_cassette=dict(type='path', required=False, fallback=(env_fallback, ['OVH_API_CASSETTE'])),
+        api_cassette_mode=dict(type='str', required=False, default='replay', choices=CASSETTE_MODES,
+                               fallback=(env_fallback, ['OVH_API_CASSETTE_MODE'])),
+        api_cassette_timing=dict(type='str', required=False, default='none', choices=CASSETTE_TIMINGS,
+                                 fallback=(env_fallback, ['OVH_API_CASSETTE_TIMING'])),
     )
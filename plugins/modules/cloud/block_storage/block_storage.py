@@ -83,6 +83,19 @@ options:
         default: present
         required: false
         type: str
+    wait:
+        description:
+            - Wait for the block storage to be available, attached, or deleted when I(state=absent), before returning
+            - Detaching a block storage and creating one to attach it always wait for the block storage to be available
+        required: false
+        default: false
+        type: bool
+    wait_timeout:
+        description:
+            - Maximum time to wait, in seconds
+        required: false
+        default: 600
+        type: int
 '''
 
 EXAMPLES = '''
@@ -98,7 +111,9 @@ EXAMPLES = '''
 
 RETURN = ''' # '''
 
-from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import (
+    ovh_api_connect, ovh_argument_spec, ovh_profile, ovh_wait_argument_spec, OvhResolver, OvhWaitError, wait_for_status
+)
 
 try:
     from ovh.exceptions import APIError
@@ -161,6 +176,7 @@ def run_module():
             required=False
         )
     ))
+    module_args.update(ovh_wait_argument_spec())
 
     module = AnsibleModule(
         argument_spec=module_args,
@@ -179,27 +195,25 @@ def run_module():
     instance_name = module.params['instance_name']
     upsize = module.params['upsize']
     state = module.params['state']
+    wait = module.params['wait']
+    wait_timeout = module.params['wait_timeout']
 
-    volume_list = []
     volume_id = ""
     volume_details = {}
 
-    instance_list = []
     instance_id = ""
 
+    resolver = OvhResolver(client, '/cloud/project/%s' % service_name)
+
     try:
-        volume_list = client.get('/cloud/project/%s/volume' % service_name, region=region)
+        volume_id = resolver.resolve('volume', name, region=region, verify=True)
+        if volume_id:
+            volume_details = resolver.fetched('volume', volume_id) or client.get(
+                '/cloud/project/%s/volume/%s' % (service_name, volume_id)
+            )
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
-    for volume in volume_list:
-        if volume['name'] == name:
-            volume_id = volume['id']
-            try:
-                volume_details = client.get('/cloud/project/%s/volume/%s' % (service_name, volume_id))
-            except APIError as api_error:
-                module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
-
     if volume_id:
         if state == "present" or state == "attach":
             if upsize:
@@ -211,18 +225,24 @@ def run_module():
                             '/cloud/project/%s/volume/%s/upsize' % (service_name, volume_id),
                             size=size
                         )
+                        if wait:
+                            wait_for_status(
+                                client,
+                                '/cloud/project/%s/volume/%s' % (service_name, volume_id),
+                                ['available', 'in-use'],
+                                wait_timeout,
+                                failures=['error', 'error_extending']
+                            )
                     except APIError as api_error:
                         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+                    except OvhWaitError as wait_error:
+                        module.fail_json(msg="Block storage {} not upsized: {}".format(name, wait_error))
             if state == "attach":
                 try:
-                    instance_list = client.get('/cloud/project/%s/instance' % (service_name))
+                    instance_id = resolver.resolve('instance', instance_name, verify=True) or ""
                 except APIError as api_error:
                     module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
-                for instance in instance_list:
-                    if instance['name'] == instance_name:
-                        instance_id = instance['id']
-
                 if instance_id in volume_details["attachedTo"]:
                     module.exit_json(
                         msg="Block storage {} already exists and attached to {}".format(name, instance_name),
@@ -234,9 +254,15 @@ def run_module():
                             '/cloud/project/%s/volume/%s/attach' % (service_name, volume_id),
                             instanceId=instance_id
                         )
+                        if wait:
+                            result = wait_for_status(
+                                client, '/cloud/project/%s/volume/%s' % (service_name, volume_id), ['in-use'], wait_timeout
+                            )
                         module.exit_json(changed=True, **result)
                     except APIError as api_error:
                         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+                    except OvhWaitError as wait_error:
+                        module.fail_json(msg="Block storage {} not attached: {}".format(name, wait_error))
             else:
                 if size:
                     module.exit_json(msg="Size of block storage {} updated".format(name), changed=True)
@@ -246,17 +272,17 @@ def run_module():
             if volume_details["attachedTo"]:
                 for instance in volume_details["attachedTo"]:
                     try:
-                        detach = client.post(
+                        client.post(
                             '/cloud/project/%s/volume/%s/detach' % (service_name, volume_id),
                             instanceId=instance
                         )
-                        while detach["status"] == "detaching":
-                            try:
-                                detach = client.get('/cloud/project/%s/volume/%s' % (service_name, volume_id))
-                            except APIError as api_error:
-                                module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+                        wait_for_status(
+                            client, '/cloud/project/%s/volume/%s' % (service_name, volume_id), ['available'], wait_timeout
+                        )
                     except APIError as api_error:
                         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+                    except OvhWaitError as wait_error:
+                        module.fail_json(msg="Block storage {} not detached: {}".format(name, wait_error))
             if state == 'detach':
                 if volume_details["attachedTo"]:
                     module.exit_json(msg="Block storage {} detached".format(name), changed=True)
@@ -265,9 +291,13 @@ def run_module():
             else:
                 try:
                     _ = client.delete('/cloud/project/%s/volume/%s' % (service_name, volume_id))
+                    if wait:
+                        wait_for_status(client, '/cloud/project/%s/volume/%s' % (service_name, volume_id), [None], wait_timeout)
                     module.exit_json(msg="Block storage {} has been deleted".format(name), changed=True)
                 except APIError as api_error:
                     module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+                except OvhWaitError as wait_error:
+                    module.fail_json(msg="Block storage {} not deleted: {}".format(name, wait_error))
     else:
         if state == "absent" or state == "detach":
             module.exit_json(msg="Block storage {} does not exist".format(name), changed=False)
@@ -277,21 +307,15 @@ def run_module():
 
             if image_name:
                 try:
-                    images = client.get('/cloud/project/%s/image' % service_name, region=region)
+                    image_id = resolver.resolve('image', image_name, region=region) or ""
                 except APIError as api_error:
                     module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
-                for image in images:
-                    if image["name"] == image_name:
-                        image_id = image["id"]
 
             if snapshot_name:
                 try:
-                    snapshots = client.get('/cloud/project/%s/snapshot' % (service_name))
+                    snapshot_id = resolver.resolve('snapshot', snapshot_name) or ""
                 except APIError as api_error:
                     module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
-                for snapshot in snapshots:
-                    if snapshot["name"] == snapshot_name:
-                        snapshot_id = snapshot["id"]
 
             payload = {
                 "name": name,
@@ -305,31 +329,40 @@ def run_module():
             result = ""
             try:
                 result = client.post('/cloud/project/%s/volume' % (service_name), **payload)
+                if wait or state == 'attach':
+                    result = wait_for_status(
+                        client, '/cloud/project/%s/volume/%s' % (service_name, result["id"]), ['available'], wait_timeout
+                    )
             except APIError as api_error:
                 module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+            except OvhWaitError as wait_error:
+                module.fail_json(msg="Block storage {} not available: {}".format(name, wait_error))
             if state == 'present':
                 module.exit_json(changed=True, **result)
             else:
                 try:
-                    instance_list = client.get('/cloud/project/%s/instance' % (service_name))
+                    instance_id = resolver.resolve('instance', instance_name, verify=True) or ""
                 except APIError as api_error:
                     module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
-                for instance in instance_list:
-                    if instance['name'] == instance_name:
-                        instance_id = instance['id']
                 try:
                     attach = client.post(
                         '/cloud/project/%s/volume/%s/attach' % (service_name, result["id"]),
                         instanceId=instance_id
                     )
+                    if wait:
+                        attach = wait_for_status(
+                            client, '/cloud/project/%s/volume/%s' % (service_name, result["id"]), ['in-use'], wait_timeout
+                        )
                     module.exit_json(changed=True, **attach)
                 except APIError as api_error:
                     module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+                except OvhWaitError as wait_error:
+                    module.fail_json(msg="Block storage {} not attached: {}".format(name, wait_error))
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'block_storage')
 
 
 if __name__ == '__main__':
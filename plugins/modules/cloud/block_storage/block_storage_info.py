@@ -47,7 +47,7 @@ EXAMPLES = '''
 
 RETURN = ''' # '''
 
-from ansible_collections.synthesio.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec, ovh_profile, OvhResolver
 
 try:
     from ovh.exceptions import APIError
@@ -84,28 +84,26 @@ def run_module():
     name = module.params['name']
     region = module.params['region']
 
-    volume_list = []
     volume_id = ""
     volume_details = {}
+
+    resolver = OvhResolver(client, '/cloud/project/%s' % service_name)
+
     try:
-        volume_list = client.get('/cloud/project/%s/volume' % service_name, region=region)
+        volume_id = resolver.resolve('volume', name, region=region, verify=True, relist_missing=False)
+        if volume_id:
+            volume_details = resolver.fetched('volume', volume_id) or client.get(
+                '/cloud/project/%s/volume/%s' % (service_name, volume_id)
+            )
+            module.exit_json(changed=True, **volume_details)
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
-    for volume in volume_list:
-        if volume['name'] == name:
-            volume_id = volume['id']
-            try:
-                volume_details = client.get('/cloud/project/%s/volume/%s' % (service_name, volume_id))
-                module.exit_json(changed=True, **volume_details)
-            except APIError as api_error:
-                module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
-
     # TO DO Add instance info
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'block_storage_info')
 
 
 if __name__ == '__main__':
@@ -15,6 +15,8 @@ version_added: "0.1.0"
 
 description:
     - This module manage the creation and update of a OVH public cloud dbaas cluster.
+    - With C(clusters), it manages several clusters in one task, checked against one download of the availability,
+      looked up with one listing per database type, then created and updated concurrently.
 
 requirements:
     - ovh >= 0.5.0
@@ -29,33 +31,39 @@ options:
     name:
         description:
             - The name of the cluster to look for
-        required: true
+            - Required unless C(clusters) is set, mutually exclusive with C(clusters)
+        required: false
         type: str
     type:
         description:
             - The database type
-        required: true
+            - Required with C(name), default of the C(clusters) which do not set it
+        required: false
         type: str
         choices: ['kafka', 'mongodb', 'mysql', 'opensearch', 'postgresql', 'redis']
     version:
         description:
             - The database engine version
-        required: true
+            - Required with C(name), default of the C(clusters) which do not set it
+        required: false
         type: str
     flavor:
         description:
             - The instance type to provision for the cluster
-        required: true
+            - Required with C(name), default of the C(clusters) which do not set it
+        required: false
         type: str
     region:
         description:
             - Region hosting the cluster
-        required: true
+            - Required with C(name), default of the C(clusters) which do not set it
+        required: false
         type: str
     plan:
         description:
             - The OVH plan to use
-        required: true
+            - Required with C(name), default of the C(clusters) which do not set it
+        required: false
         type: str
     network_id:
         description:
@@ -67,6 +75,29 @@ options:
             - The ID of the specific subnet to use from the private network
         required: false
         type: str
+    clusters:
+        description:
+            - The clusters to create or update, each one with its C(name) and the C(type), C(version), C(flavor),
+              C(region), C(plan), C(network_id) and C(subnet_id) options which differ from the task ones
+            - The results of the clusters are returned as C(clusters), in the same order
+        required: false
+        type: list
+        elements: dict
+    wait:
+        description:
+            - Wait for the clusters to be READY before returning, they are then returned with their endpoints
+            - The status is polled with a backoff
+            - To create several clusters in parallel, create them without waiting then wait for all of them
+              with the C(names) and C(wait) options of mgdis.ovh.db_cluster_info
+        required: false
+        default: false
+        type: bool
+    wait_timeout:
+        description:
+            - Maximum time to wait, in seconds
+        required: false
+        default: 600
+        type: int
 
 '''
 
@@ -81,12 +112,50 @@ mgdis.ovh.db_cluster:
   plan: essential
   network_id: myNetwork
   subnet_id: mySubnet
+
+- name: Create the clusters without waiting
+  mgdis.ovh.db_cluster:
+    service_name: abcdefghijklmnopqrstuvwxyz012345
+    name: "{{ item }}"
+    type: postgresql
+    version: 15
+    flavor: db1-4
+    region: GRA
+    plan: essential
+  loop: [app1, app2, app3]
+
+- name: Wait for all of them
+  mgdis.ovh.db_cluster_info:
+    service_name: abcdefghijklmnopqrstuvwxyz012345
+    names: [app1, app2, app3]
+    type: postgresql
+    wait: true
+  register: clusters
+
+- name: Create or update several clusters in one task
+  mgdis.ovh.db_cluster:
+    service_name: abcdefghijklmnopqrstuvwxyz012345
+    type: postgresql
+    version: 15
+    flavor: db1-4
+    region: GRA
+    plan: essential
+    clusters:
+      - name: app1
+      - name: app2
+        flavor: db1-7
+      - name: reporting
+        type: mongodb
+        version: 6.0
+    wait: true
 '''
 
 RETURN = ''' # '''
 
-from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
-from deepdiff import DeepDiff
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import (
+    ovh_api_connect, ovh_argument_spec, ovh_profile, ovh_wait_argument_spec, fetch_concurrently, DatabaseCatalog,
+    DatabaseOffers, OvhResolver, OvhWaitError, wait_for_status, wait_for_statuses
+)
 
 try:
     from ovh.exceptions import APIError
@@ -94,151 +163,264 @@ try:
 except ImportError:
     HAS_OVH = False
 
+DB_TYPES = ['kafka', 'mongodb', 'mysql', 'opensearch', 'postgresql', 'redis']
+SPEC_FIELDS = ('type', 'version', 'flavor', 'region', 'plan', 'network_id', 'subnet_id')
+REQUIRED_FIELDS = ('type', 'version', 'flavor', 'region', 'plan')
+
+
+def cluster_changes(cluster, details):
+    """Return the fields of ``details`` which differ from ``cluster``.
+
+    Strings are compared case insensitively, like the offers, and None
+    values are left out.
+    """
+    def normalize(value):
+        return value.casefold() if isinstance(value, str) else value
+
+    return dict(
+        (key, value) for key, value in details.items()
+        if value is not None and normalize(value) != normalize(cluster.get(key))
+    )
+
+
+def offer_criteria(spec):
+    return {
+        "engine": spec['type'],
+        "version": spec['version'],
+        "plan": spec['plan'],
+        "region": spec['region'],
+        "flavor": spec['flavor'],
+        "network": "private" if spec['network_id'] else "public"
+    }
+
+
+def find_offers(catalog, specs):
+    """Return the DatabaseOffers of the project and the offer of each spec, None when it is not available."""
+    offers = catalog.availability()
+    found = [offers.find(offer_criteria(spec)) for spec in specs]
+    if not all(found):
+        # Offers may be newer than the cached catalog
+        offers = catalog.availability(refresh=True)
+        found = [offers.find(offer_criteria(spec)) for spec in specs]
+    return offers, found
+
+
+def unavailable_message(offers, spec):
+    criteria = offer_criteria(spec)
+    msg = "Cluster with parameters : %s not available" % DatabaseOffers.describe(criteria)
+    nearest = offers.nearest(criteria)
+    if nearest:
+        msg += ". Nearest available combinations: %s" % "; ".join(DatabaseOffers.describe(offer) for offer in nearest)
+    return msg
+
+
+def existing_clusters(client, resolver, service_name, specs):
+    """Return the cluster of each spec, None for the clusters to create.
+
+    A single cluster is looked up by name, the listing stops at the first
+    match. Several clusters are looked up in the index of their database
+    type; those the listing did not stream, e.g. when the index is cached,
+    are then fetched together.
+    """
+    if len(specs) == 1:
+        spec = specs[0]
+        cluster_id = resolver.database_cluster(spec['type'], spec['name'], verify=True)
+        if not cluster_id:
+            return [None]
+        return [resolver.fetched('database/%s' % spec['type'], cluster_id) or client.get(
+            '/cloud/project/%s/database/%s/%s' % (service_name, spec['type'], cluster_id)
+        )]
+
+    clusters = {}
+    for db_type in sorted(set(spec['type'] for spec in specs)):
+        clusters[db_type] = resolver.database_cluster_objects(
+            db_type, [spec['name'] for spec in specs if spec['type'] == db_type], relist_missing=True
+        )
+    return [clusters[spec['type']].get(spec['name']) for spec in specs]
+
+
+def apply_spec(client, service_name, spec, offer, cluster):
+    """Create the cluster of ``spec`` or update the fields of ``cluster`` which differ.
+
+    :returns: changed, diff and the cluster
+    """
+    path = '/cloud/project/%s/database/%s' % (service_name, spec['type'])
+    nb_nodes = offer["minNodeNumber"]
+    private = bool(spec['network_id'])
+
+    if cluster:
+        details = {
+            "description": spec['name'],
+            "flavor": spec['flavor'],
+            "nodeNumber": nb_nodes,
+            "plan": spec['plan'],
+            "version": spec['version']
+        }
+        if private:
+            details["subnetId"] = spec['subnet_id']
+        changes = cluster_changes(cluster, details)
+        diff = {
+            "before": dict((key, cluster.get(key)) for key in changes),
+            "after": changes
+        }
+        if changes:
+            client.put('%s/%s' % (path, cluster['id']), **changes)
+            cluster = dict(cluster, **changes)
+        return bool(changes), diff, cluster
+
+    details = {
+        "description": spec['name'],
+        "nodesPattern": {
+            "flavor": spec['flavor'],
+            "number": nb_nodes,
+            "region": spec['region']
+        },
+        "plan": spec['plan'],
+        "version": spec['version']
+    }
+    if private:
+        details["networkId"] = spec['network_id']
+        details["subnetId"] = spec['subnet_id']
+    return True, {"before": {}, "after": details}, client.post(path, **details)
+
 
 def run_module():
     module_args = ovh_argument_spec()
     module_args.update(dict(
         service_name=dict(type='str', required=True),
-        name=dict(type='str', required=True),
-        type=dict(
-            type='str',
-            required=True,
-            choices=['kafka', 'mongodb', 'mysql', 'opensearch', 'postgresql', 'redis']
-        ),
-        version=dict(type='str', required=True),
-        flavor=dict(type='str', required=True),
-        region=dict(type='str', required=True),
-        plan=dict(type='str', required=True),
+        name=dict(type='str', required=False),
+        type=dict(type='str', required=False, choices=DB_TYPES),
+        version=dict(type='str', required=False),
+        flavor=dict(type='str', required=False),
+        region=dict(type='str', required=False),
+        plan=dict(type='str', required=False),
         network_id=dict(type='str', required=False),
         subnet_id=dict(type='str', required=False),
+        clusters=dict(
+            type='list',
+            required=False,
+            elements='dict',
+            options=dict(
+                name=dict(type='str', required=True),
+                type=dict(type='str', required=False, choices=DB_TYPES),
+                version=dict(type='str', required=False),
+                flavor=dict(type='str', required=False),
+                region=dict(type='str', required=False),
+                plan=dict(type='str', required=False),
+                network_id=dict(type='str', required=False),
+                subnet_id=dict(type='str', required=False)
+            )
+        ),
     ))
+    module_args.update(ovh_wait_argument_spec())
 
     module = AnsibleModule(
         argument_spec=module_args,
+        mutually_exclusive=[('name', 'clusters')],
+        required_one_of=[('name', 'clusters')],
+        required_by={'name': REQUIRED_FIELDS},
         supports_check_mode=False
     )
     client = ovh_api_connect(module)
 
-    available = False
-    exists = False
-    cluster = None
-    network = "public"
-
-    name = module.params['name']
     service_name = module.params['service_name']
-    db_type = module.params['type']
-    version = module.params['version']
-    flavor = module.params['flavor']
-    region = module.params['region']
-    plan = module.params['plan']
-    network_id = module.params['network_id']
-    subnet_id = module.params['subnet_id']
-    nb_nodes = 1
-
-    if network_id:
-        network = "private"
+    wait = module.params['wait']
+    wait_timeout = module.params['wait_timeout']
+    bulk = module.params['clusters'] is not None
 
-    try:
-        availability = client.get(
-            '/cloud/project/%s/database/availability' % (service_name)
-        )
-        to_check = {
-            "engine": db_type,
-            "version": version,
-            "plan": plan,
-            "region": region,
-            "flavor": flavor,
-            "network": network
-        }
+    if bulk and not module.params['clusters']:
+        module.exit_json(changed=False, diff=[], clusters=[])
 
-        for offer in availability:
-            diff = DeepDiff(
-                offer,
-                to_check,
-                ignore_string_case=True,
-                exclude_paths=[
-                    "root['default']",
-                    "root['startDate']",
-                    "root['endOfLife']",
-                    "root['upstreamEndOfLife']",
-                    "root['backup']",
-                    "root['minNodeNumber']",
-                    "root['maxNodeNumber']",
-                    "root['minDiskSize']",
-                    "root['maxDiskSize']",
-                    "root['status']"
-                ]
-            )
-            if not diff:
-                available = True
-                nb_nodes = offer["minNodeNumber"]
-                break
-        if not available:
-            msg = "Cluster with parameters : engine: %s, version: %s, plan: %s, region: %s, flavor: %s, network: %s not available" % (
-                db_type,
-                version,
-                plan,
-                region,
-                flavor,
-                network
-            )
-            module.fail_json(msg=msg)
+    specs = []
+    for item in module.params['clusters'] if bulk else [module.params]:
+        spec = dict((field, item[field] if item[field] is not None else module.params[field]) for field in SPEC_FIELDS)
+        spec['name'] = item['name']
+        missing = [field for field in REQUIRED_FIELDS if not spec[field]]
+        if missing:
+            module.fail_json(msg="Cluster {} misses {}".format(spec['name'], ", ".join(missing)))
+        specs.append(spec)
+    duplicates = sorted(set(
+        "%s %s" % (spec['type'], spec['name']) for index, spec in enumerate(specs)
+        if any(other['type'] == spec['type'] and other['name'] == spec['name'] for other in specs[:index])
+    ))
+    if duplicates:
+        module.fail_json(msg="Clusters listed more than once: {}".format(", ".join(duplicates)))
+
+    catalog = DatabaseCatalog(client, service_name)
+    resolver = OvhResolver(client, '/cloud/project/%s' % service_name)
+    try:
+        offers, found = find_offers(catalog, specs)
+        unavailable = [unavailable_message(offers, spec) for spec, offer in zip(specs, found) if not offer]
+        if unavailable:
+            module.fail_json(msg=". ".join(unavailable))
+        clusters = existing_clusters(client, resolver, service_name, specs)
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
-    if available:
+    def apply(index):
         try:
-            cluster_ids = client.get('/cloud/project/%s/database/%s' % (service_name, db_type))
-            for cluster_id in cluster_ids:
-                try:
-                    cluster_values = client.get('/cloud/project/%s/database/%s/%s' % (service_name, db_type, cluster_id))
-                    if cluster_values["description"] == name:
-                        exists = True
-                        cluster = cluster_id
-                        break
-                except APIError as api_error:
-                    module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+            return apply_spec(client, service_name, specs[index], found[index], clusters[index])
         except APIError as api_error:
-            module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+            return api_error
 
-    if exists:
-        try:
-            details = {
-                "description": name,
-                "flavor": flavor,
-                "nodeNumber": nb_nodes,
-                "plan": plan,
-                "version": version
-            }
-            if network == "private":
-                details["subnetId"] = subnet_id
-            result = client.put('/cloud/project/%s/database/%s/%s' % (service_name, db_type, cluster), **details)
-            module.exit_json(changed=False, **result)
-        except APIError as api_error:
-            module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
-    else:
+    outcomes = fetch_concurrently(apply, range(len(specs)), max_workers=client.max_workers)
+
+    if not bulk:
+        spec = specs[0]
+        if isinstance(outcomes[0], APIError):
+            module.fail_json(msg="Failed to call OVH API: {0}".format(outcomes[0]))
+        changed, diff, result = outcomes[0]
         try:
-            details = {
-                "description": name,
-                "nodesPattern": {
-                    "flavor": flavor,
-                    "number": nb_nodes,
-                    "region": region
-                },
-                "plan": plan,
-                "version": version
-            }
-            if network == "private":
-                details["networkId"] = network_id
-                details["subnetId"] = subnet_id
-            result = client.post('/cloud/project/%s/database/%s' % (service_name, db_type), **details)
-            module.exit_json(changed=False, **result)
+            if wait:
+                result = wait_for_status(
+                    client, '/cloud/project/%s/database/%s/%s' % (service_name, spec['type'], result['id']), ['READY'], wait_timeout
+                )
         except APIError as api_error:
             module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+        except OvhWaitError as wait_error:
+            module.fail_json(msg="Cluster {} not ready: {}".format(spec['name'], wait_error))
+        module.exit_json(changed=changed, diff=diff, **result)
+
+    results = []
+    for index, spec in enumerate(specs):
+        if isinstance(outcomes[index], APIError):
+            results.append({"name": spec['name'], "type": spec['type'], "changed": False, "failed": True,
+                            "msg": "Failed to call OVH API: {0}".format(outcomes[index])})
+        else:
+            changed, diff, cluster = outcomes[index]
+            results.append({"name": spec['name'], "type": spec['type'], "changed": changed, "diff": diff, "cluster": cluster})
+    changed = any(result['changed'] for result in results)
+    diff = [
+        dict(result['diff'], before_header=result['name'], after_header=result['name'])
+        for result in results if result['changed']
+    ]
+
+    failures = [result['msg'] for result in results if result.get('failed')]
+    if wait:
+        for db_type in sorted(set(result['type'] for result in results if not result.get('failed'))):
+            try:
+                ready = wait_for_statuses(
+                    client, '/cloud/project/%s/database/%s' % (service_name, db_type),
+                    [result['cluster']['id'] for result in results if result['type'] == db_type and not result.get('failed')],
+                    ['READY'], wait_timeout
+                )
+            except APIError as api_error:
+                failures.append("Failed to call OVH API: {0}".format(api_error))
+                continue
+            except OvhWaitError as wait_error:
+                failures.append("Clusters not ready: {}".format(wait_error))
+                ready = wait_error.resource
+            for result in results:
+                if result['type'] == db_type and not result.get('failed') and ready.get(result['cluster']['id']):
+                    result['cluster'] = ready[result['cluster']['id']]
+
+    if failures:
+        module.fail_json(msg=". ".join(failures), changed=changed, diff=diff, clusters=results)
+    module.exit_json(changed=changed, diff=diff, clusters=results)
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'db_cluster')
 
 
 if __name__ == '__main__':
@@ -15,6 +15,7 @@ version_added: "0.1.0"
 
 description:
     - This module retrieves all info of a managed database cluster.
+    - With C(names), it retrieves several clusters at once, e.g. to wait for clusters created without waiting.
 
 requirements:
     - ovh >= 0.5.0
@@ -29,14 +30,35 @@ options:
     name:
         description:
             - The name of the cluster to look for
-        required: true
+            - Mutually exclusive with C(names)
+        required: false
         type: str
+    names:
+        description:
+            - The names of the clusters to look for, returned as C(clusters) in the same order
+            - Mutually exclusive with C(name)
+        required: false
+        type: list
+        elements: str
     type:
         description:
             - The database type
         required: true
         type: str
         choices: ['kafka', 'mongodb', 'mysql', 'opensearch', 'postgresql', 'redis']
+    wait:
+        description:
+            - Wait for the clusters to be READY before returning
+            - The clusters still pending are polled together, with a backoff
+        required: false
+        default: false
+        type: bool
+    wait_timeout:
+        description:
+            - Maximum time to wait, in seconds
+        required: false
+        default: 600
+        type: int
 '''
 
 EXAMPLES = '''
@@ -44,11 +66,21 @@ mgdis.ovh.db_cluster_info:
   service_name: abcdefghijklmnopqrstuvwxyz012345
   name: myClusterName
   type: mongodb
+
+mgdis.ovh.db_cluster_info:
+  service_name: abcdefghijklmnopqrstuvwxyz012345
+  names:
+    - myFirstCluster
+    - mySecondCluster
+  type: mongodb
+  wait: true
 '''
 
 RETURN = ''' # '''
 
-from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import (
+    ovh_api_connect, ovh_argument_spec, ovh_profile, ovh_wait_argument_spec, OvhResolver, OvhWaitError, wait_for_statuses
+)
 
 try:
     from ovh.exceptions import APIError
@@ -61,46 +93,67 @@ def run_module():
     module_args = ovh_argument_spec()
     module_args.update(dict(
         service_name=dict(type='str', required=True),
-        name=dict(type='str', required=True),
+        name=dict(type='str', required=False),
+        names=dict(type='list', elements='str', required=False),
         type=dict(
             type='str',
             required=True,
             choices=['kafka', 'mongodb', 'mysql', 'opensearch', 'postgresql', 'redis']
         )
     ))
+    module_args.update(ovh_wait_argument_spec())
 
     module = AnsibleModule(
         argument_spec=module_args,
+        mutually_exclusive=[('name', 'names')],
+        required_one_of=[('name', 'names')],
         supports_check_mode=False
     )
     client = ovh_api_connect(module)
 
     service_name = module.params['service_name']
     cluster_name = module.params['name']
+    cluster_names = module.params['names']
     db_type = module.params['type']
+    wait = module.params['wait']
+    wait_timeout = module.params['wait_timeout']
+    path = '/cloud/project/%s/database/%s' % (service_name, db_type)
+    several = cluster_names is not None
+
+    if several and not cluster_names:
+        module.exit_json(changed=False, clusters=[])
 
-    info = ""
+    resolver = OvhResolver(client, '/cloud/project/%s' % service_name)
 
     try:
-        clusters = client.get('/cloud/project/%s/database/%s' % (service_name, db_type))
-        for cluster in clusters:
-            try:
-                result = client.get('/cloud/project/%s/database/%s/%s' % (service_name, db_type, cluster))
-                if result['description'] == cluster_name:
-                    info = result
-            except APIError as api_error:
-                module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+        if several:
+            clusters = resolver.database_cluster_objects(db_type, cluster_names)
+        else:
+            cluster_id = resolver.database_cluster(db_type, cluster_name, verify=True, relist_missing=False)
+            clusters = {}
+            if cluster_id:
+                clusters[cluster_name] = resolver.fetched('database/%s' % db_type, cluster_id) or client.get(
+                    '%s/%s' % (path, cluster_id)
+                )
+        for name in cluster_names or [cluster_name]:
+            if name not in clusters:
+                module.fail_json(msg="Cluster {} not found for database_type {}".format(name, db_type))
+
+        if wait:
+            ready = wait_for_statuses(client, path, set(cluster['id'] for cluster in clusters.values()), ['READY'], wait_timeout)
+            clusters = dict((name, ready[cluster['id']]) for name, cluster in clusters.items())
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+    except OvhWaitError as wait_error:
+        module.fail_json(msg="Clusters not ready: {}".format(wait_error))
 
-    if info:
-        module.exit_json(changed=False, **info)
-    else:
-        module.fail_json(msg="Cluster {} not found for database_type {}".format(cluster_name, db_type))
+    if several:
+        module.exit_json(changed=False, clusters=[clusters[name] for name in cluster_names])
+    module.exit_json(changed=False, **clusters[cluster_name])
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'db_cluster_info')
 
 
 if __name__ == '__main__':
@@ -42,6 +42,18 @@ options:
             - The ip blocks to add
         required: true
         type: list
+    wait:
+        description:
+            - Wait for the added ip blocks to be READY before returning
+        required: false
+        default: false
+        type: bool
+    wait_timeout:
+        description:
+            - Maximum time to wait, in seconds
+        required: false
+        default: 600
+        type: int
 
 '''
 
@@ -57,7 +69,10 @@ mgdis.ovh.db_cluster_restriction:
 
 RETURN = ''' # '''
 
-from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import (
+    ovh_api_connect, ovh_argument_spec, ovh_profile, ovh_wait_argument_spec, OvhResolver, OvhWaitError, wait_for_status
+)
+import urllib.parse
 
 try:
     from ovh.exceptions import APIError
@@ -92,6 +107,7 @@ def run_module():
             )
         )
     ))
+    module_args.update(ovh_wait_argument_spec())
 
     module = AnsibleModule(
         argument_spec=module_args,
@@ -103,19 +119,16 @@ def run_module():
     service_name = module.params['service_name']
     db_type = module.params['type']
     ip_blocks = module.params['ip_blocks']
+    wait = module.params['wait']
+    wait_timeout = module.params['wait_timeout']
 
-    ip_added = False
+    ip_added = []
     cluster_id = ""
 
+    resolver = OvhResolver(client, '/cloud/project/%s' % service_name)
+
     try:
-        clusters = client.get('/cloud/project/%s/database/%s' % (service_name, db_type))
-        for cluster in clusters:
-            try:
-                result = client.get('/cloud/project/%s/database/%s/%s' % (service_name, db_type, cluster))
-                if result['description'] == cluster_name:
-                    cluster_id = cluster
-            except APIError as api_error:
-                module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+        cluster_id = resolver.database_cluster(db_type, cluster_name, verify=True)
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
@@ -127,9 +140,19 @@ def run_module():
         for ip_block in ip_blocks:
             if ip_block["ip"] not in restrictions:
                 client.post('/cloud/project/%s/database/%s/%s/ipRestriction' % (service_name, db_type, cluster_id), **ip_block)
-                ip_added = True
+                ip_added.append(ip_block["ip"])
+        if wait:
+            for ip in ip_added:
+                wait_for_status(
+                    client,
+                    '/cloud/project/%s/database/%s/%s/ipRestriction/%s' % (service_name, db_type, cluster_id, urllib.parse.quote(ip, safe='')),
+                    ['READY'],
+                    wait_timeout
+                )
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+    except OvhWaitError as wait_error:
+        module.fail_json(msg="IP restrictions of cluster {} not ready: {}".format(cluster_name, wait_error))
 
     if ip_added:
         module.exit_json(changed=True)
@@ -138,7 +161,7 @@ def run_module():
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'db_cluster_ip_restriction')
 
 
 if __name__ == '__main__':
@@ -52,6 +52,19 @@ options:
             - If the user should be created or deleted
         required: true
         type: str
+    wait:
+        description:
+            - Wait for the user to be READY again after updating it
+            - An existing user is always waited for until it is READY before being updated
+        required: false
+        default: false
+        type: bool
+    wait_timeout:
+        description:
+            - Maximum time to wait, in seconds
+        required: false
+        default: 600
+        type: int
 
 '''
 
@@ -67,9 +80,10 @@ mgdis.ovh.db_cluster_user:
 
 RETURN = ''' # '''
 
-from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import (
+    ovh_api_connect, ovh_argument_spec, ovh_profile, ovh_wait_argument_spec, OvhResolver, OvhWaitError, wait_for_status
+)
 import re
-import time
 
 try:
     from ovh.exceptions import APIError
@@ -78,19 +92,16 @@ except ImportError:
     HAS_OVH = False
 
 
-def get_userid(module, client, details, service_name, db_type, cluster_id):
+def get_userid(module, resolver, details, db_type, cluster_id):
     user = ""
     try:
-        user_ids = client.get(
-            '/cloud/project/%s/database/%s/%s/user' % (service_name, db_type, cluster_id)
-        )
-        for user_id in user_ids:
-            u = client.get(
-                '/cloud/project/%s/database/%s/%s/user/%s' % (service_name, db_type, cluster_id, user_id)
-            )
-            if details["name"] == re.sub("@.+", "", u["username"]):  # Todo split u["username"] for better comparison
-                user = user_id
-                break
+        user = resolver.resolve(
+            'database/%s/%s/user' % (db_type, cluster_id),
+            details["name"],
+            key=lambda u: re.sub("@.+", "", u["username"]),  # Todo split u["username"] for better comparison
+            details=True,
+            verify=True
+        ) or ""
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
     return user
@@ -115,6 +126,7 @@ def run_module():
             default='present'
         )
     ))
+    module_args.update(ovh_wait_argument_spec())
 
     module = AnsibleModule(
         argument_spec=module_args,
@@ -128,58 +140,52 @@ def run_module():
     username = module.params['username']
     roles = module.params['roles']
     state = module.params['state']
+    wait = module.params['wait']
+    wait_timeout = module.params['wait_timeout']
 
     user = ""
     cluster_id = ""
-    status = "PENDING"
 
     details = {
         "name": username,
         "roles": roles
     }
 
+    resolver = OvhResolver(client, '/cloud/project/%s' % service_name)
+
     try:
-        clusters = client.get('/cloud/project/%s/database/%s' % (service_name, db_type))
-        for cluster in clusters:
-            try:
-                result = client.get('/cloud/project/%s/database/%s/%s' % (service_name, db_type, cluster))
-                if result['description'] == cluster_name:
-                    cluster_id = cluster
-            except APIError as api_error:
-                module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+        cluster_id = resolver.database_cluster(db_type, cluster_name, verify=True)
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
     if not cluster_id:
         module.fail_json(msg="Cluster {0} not found".format(cluster_name))
 
-    user = get_userid(module, client, details, service_name, db_type, cluster_id)
+    user = get_userid(module, resolver, details, db_type, cluster_id)
 
     if state == 'present':
         if user:
-            while status != 'READY':
-                time.sleep(2)
-                try:
-                    u = client.get(
-                        '/cloud/project/%s/database/%s/%s/user/%s' % (service_name, db_type, cluster_id, user)
-                    )
-                    if details["name"] == re.sub("@.+", "", u["username"]):
-                        status = u["status"]
-                        for actualRole in u["roles"]:
-                            if actualRole not in roles:
-                                roles.append(actualRole)
-                except APIError as api_error:
-                    module.fail_json(msg="Failed to call OVH API0: {0}".format(api_error))
+            user_path = '/cloud/project/%s/database/%s/%s/user/%s' % (service_name, db_type, cluster_id, user)
+            try:
+                u = wait_for_status(client, user_path, ['READY'], wait_timeout)
+                for actualRole in u["roles"]:
+                    if actualRole not in roles:
+                        roles.append(actualRole)
+            except APIError as api_error:
+                module.fail_json(msg="Failed to call OVH API0: {0}".format(api_error))
+            except OvhWaitError as wait_error:
+                module.fail_json(msg="User {} not ready: {}".format(username, wait_error))
             try:
                 details.pop("name")
                 details["roles"] = roles
-                client.put(
-                    '/cloud/project/%s/database/%s/%s/user/%s' % (service_name, db_type, cluster_id, user),
-                    **details
-                )
+                client.put(user_path, **details)
+                if wait:
+                    wait_for_status(client, user_path, ['READY'], wait_timeout)
                 module.exit_json(changed=True)
             except APIError as api_error:
                 module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+            except OvhWaitError as wait_error:
+                module.fail_json(msg="User {} not ready: {}".format(username, wait_error))
     elif state == 'absent':
         if user:
             try:
@@ -205,7 +211,7 @@ def run_module():
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'db_cluster_user')
 
 
 if __name__ == '__main__':
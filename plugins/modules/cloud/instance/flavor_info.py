@@ -49,7 +49,7 @@ EXAMPLES = '''
 
 RETURN = ''' # '''
 
-from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec, ovh_profile, OvhResolver
 
 try:
     from ovh.exceptions import APIError
@@ -85,22 +85,20 @@ def run_module():
     name = module.params['name']
     region = module.params['region']
 
+    resolver = OvhResolver(client, '/cloud/project/%s' % service_name)
+
     try:
-        flavor_list = client.get('/cloud/project/%s/flavor' % (service_name), region=region)
-        for flavor in flavor_list:
-            if flavor['name'] == name:
-                try:
-                    result = client.get('/cloud/project/%s/flavor/%s' % (service_name, flavor['id']))
-                    module.exit_json(changed=False, **result)
-                except APIError as api_error:
-                    module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+        flavor_id = resolver.resolve('flavor', name, region=region, verify=True, relist_missing=False)
+        if flavor_id:
+            result = resolver.fetched('flavor', flavor_id) or client.get('/cloud/project/%s/flavor/%s' % (service_name, flavor_id))
+            module.exit_json(changed=False, **result)
         module.fail_json(msg="Flavor {} not found in {}".format(name, region), changed=False)
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'flavor_info')
 
 
 if __name__ == '__main__':
@@ -50,7 +50,7 @@ EXAMPLES = '''
 
 RETURN = ''' # '''
 
-from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec, ovh_profile, OvhResolver
 
 try:
     from ovh.exceptions import APIError
@@ -86,27 +86,21 @@ def run_module():
     name = module.params['name']
     region = module.params['region']
 
+    resolver = OvhResolver(client, '/cloud/project/%s' % service_name)
+
     try:
-        image_list = client.get('/cloud/project/%s/image' % (service_name), region=region)
-        for image in image_list:
-            if image['name'] == name:
-                try:
-                    result = client.get('/cloud/project/%s/image/%s' % (service_name, image['id']), region=region)
-                    module.exit_json(changed=False, **result)
-                except APIError as api_error:
-                    module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+        image_id = resolver.resolve('image', name, region=region, verify=True, relist_missing=False)
+        if image_id:
+            result = resolver.fetched('image', image_id) or client.get('/cloud/project/%s/image/%s' % (service_name, image_id), region=region)
+            module.exit_json(changed=False, **result)
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
     try:
-        snapshot_list = client.get('/cloud/project/%s/snapshot' % (service_name), region=region)
-        for snapshot in snapshot_list:
-            if snapshot['name'] == name:
-                try:
-                    result = client.get('/cloud/project/%s/snapshot/%s' % (service_name, snapshot['id']), region=region)
-                    module.exit_json(changed=False, **result)
-                except APIError as api_error:
-                    module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+        snapshot_id = resolver.resolve('snapshot', name, region=region, verify=True, relist_missing=False)
+        if snapshot_id:
+            result = resolver.fetched('snapshot', snapshot_id) or client.get('/cloud/project/%s/snapshot/%s' % (service_name, snapshot_id), region=region)
+            module.exit_json(changed=False, **result)
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
@@ -114,7 +108,7 @@ def run_module():
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'image_info')
 
 
 if __name__ == '__main__':
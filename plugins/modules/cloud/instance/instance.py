@@ -68,6 +68,18 @@ options:
         default: present
         type: str
         choices: ['present', 'absent']
+    wait:
+        description:
+            - Wait for the instance to be ACTIVE, or deleted when I(state=absent), before returning
+        required: false
+        default: false
+        type: bool
+    wait_timeout:
+        description:
+            - Maximum time to wait, in seconds
+        required: false
+        default: 600
+        type: int
 
 '''
 
@@ -85,7 +97,9 @@ EXAMPLES = '''
 
 RETURN = ''' # '''
 
-from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import (
+    ovh_api_connect, ovh_argument_spec, ovh_profile, ovh_wait_argument_spec, OvhResolver, OvhWaitError, wait_for_status
+)
 
 try:
     from ovh.exceptions import APIError
@@ -147,6 +161,7 @@ def run_module():
             default='present'
         )
     ))
+    module_args.update(ovh_wait_argument_spec())
 
     module = AnsibleModule(
         argument_spec=module_args,
@@ -163,51 +178,39 @@ def run_module():
     networks = module.params['networks']
     monthly_billing = module.params['monthly_billing']
     state = module.params['state']
+    wait = module.params['wait']
+    wait_timeout = module.params['wait_timeout']
 
-    flavor_id = ''
-    image_id = ''
-    ssh_key_id = ''
+    resolver = OvhResolver(client, '/cloud/project/%s' % service_name)
 
     try:
-        instances_list = client.get(
-            '/cloud/project/%s/instance' % (service_name),
-            region=region
-        )
+        instance_id = resolver.resolve('instance', name, region=region, verify=True)
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
-    for instance in instances_list:
-        if instance['name'] == name:
-            if state == "present":
-                module.exit_json(
-                    changed=False,
-                    msg="Instance {} [{}] in region {} is already installed".format(name, instance["id"], region)
-                )
-            else:
-                client.delete('/cloud/project/%s/instance/%s' % (service_name, instance['id']))
-                module.exit_json(msg="Instance {} deleted".format(name), changed=True)
-
-    try:
-        flavor_list = client.get('/cloud/project/%s/flavor' % (service_name), region=region)
-        for flavor in flavor_list:
-            if flavor['name'] == flavor_name:
-                flavor_id = flavor['id']
-    except APIError as api_error:
-        module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
-
-    try:
-        ssh_key_list = client.get('/cloud/project/%s/sshkey' % (service_name), region=region)
-        for ssh_key in ssh_key_list:
-            if ssh_key['name'] == ssh_key_name:
-                ssh_key_id = ssh_key['id']
-    except APIError as api_error:
-        module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+    if instance_id:
+        if state == "present":
+            module.exit_json(
+                changed=False,
+                msg="Instance {} [{}] in region {} is already installed".format(name, instance_id, region)
+            )
+        else:
+            try:
+                client.delete('/cloud/project/%s/instance/%s' % (service_name, instance_id))
+                if wait:
+                    wait_for_status(client, '/cloud/project/%s/instance/%s' % (service_name, instance_id), [None], wait_timeout)
+            except APIError as api_error:
+                module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+            except OvhWaitError as wait_error:
+                module.fail_json(msg="Instance {} not deleted: {}".format(name, wait_error))
+            module.exit_json(msg="Instance {} deleted".format(name), changed=True)
 
     try:
-        image_list = client.get('/cloud/project/%s/image' % (service_name), region=region)
-        for image in image_list:
-            if image['name'] == image_name:
-                image_id = image['id']
+        flavor_id = resolver.resolve('flavor', flavor_name, region=region) or ''
+        ssh_key_id = ''
+        if ssh_key_name:
+            ssh_key_id = resolver.resolve('sshkey', ssh_key_name, region=region) or ''
+        image_id = resolver.resolve('image', image_name, region=region) or ''
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
@@ -221,14 +224,18 @@ def run_module():
                              networks=networks,
                              sshKeyId=ssh_key_id
                              )
+        if wait:
+            result = wait_for_status(client, '/cloud/project/%s/instance/%s' % (service_name, result['id']), ['ACTIVE'], wait_timeout)
 
         module.exit_json(changed=True, **result)
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+    except OvhWaitError as wait_error:
+        module.fail_json(msg="Instance {} not active: {}".format(name, wait_error), **(wait_error.resource or {}))
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'instance')
 
 
 if __name__ == '__main__':
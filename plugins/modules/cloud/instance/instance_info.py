@@ -43,7 +43,7 @@ EXAMPLES = '''
 
 RETURN = ''' # '''
 
-from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec, ovh_profile, OvhResolver
 
 try:
     from ovh.exceptions import APIError
@@ -74,22 +74,22 @@ def run_module():
     service_name = module.params['service_name']
     instance_name = module.params['name']
 
+    resolver = OvhResolver(client, '/cloud/project/%s' % service_name)
+
     try:
-        instance_list = client.get('/cloud/project/%s/instance' % (service_name))
-        for instance in instance_list:
-            if instance['name'] == instance_name:
-                try:
-                    result = client.get('/cloud/project/%s/instance/%s' % (service_name, instance['id']))
-                    module.exit_json(changed=False, **result)
-                except APIError as api_error:
-                    module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+        instance_id = resolver.resolve('instance', instance_name, verify=True, relist_missing=False)
+        if instance_id:
+            result = resolver.fetched('instance', instance_id) or client.get(
+                '/cloud/project/%s/instance/%s' % (service_name, instance_id)
+            )
+            module.exit_json(changed=False, **result)
         module.fail_json(msg="Instance {} not found".format(instance_name))
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'instance_info')
 
 
 if __name__ == '__main__':
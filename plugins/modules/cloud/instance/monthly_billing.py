@@ -32,6 +32,18 @@ options:
             - The of the instance to pass to monthly billing
         required: true
         type: str
+    wait:
+        description:
+            - Wait for the monthly billing to be enabled before returning
+        required: false
+        default: false
+        type: bool
+    wait_timeout:
+        description:
+            - Maximum time to wait, in seconds
+        required: false
+        default: 600
+        type: int
 
 '''
 
@@ -44,7 +56,9 @@ EXAMPLES = '''
 
 RETURN = ''' # '''
 
-from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import (
+    ovh_api_connect, ovh_argument_spec, ovh_profile, ovh_wait_argument_spec, OvhResolver, OvhWaitError, wait_for
+)
 
 try:
     from ovh.exceptions import APIError
@@ -65,6 +79,7 @@ def run_module():
             required=True
         )
     ))
+    module_args.update(ovh_wait_argument_spec())
 
     module = AnsibleModule(
         argument_spec=module_args,
@@ -75,53 +90,42 @@ def run_module():
 
     service_name = module.params['service_name']
     instance_name = module.params['name']
+    wait = module.params['wait']
+    wait_timeout = module.params['wait_timeout']
 
     instance_id = ''
 
+    resolver = OvhResolver(client, '/cloud/project/%s' % service_name)
+
     try:
-        instances_list = client.get(
-            '/cloud/project/%s/instance' % (service_name)
-        )
+        instance_id = resolver.resolve('instance', instance_name, verify=True)
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
-    for instance in instances_list:
-        if instance['name'] == instance_name:
-            instance_id = instance["id"]
-
     if not instance_id:
         module.fail_json(msg="Instance {} does not exist".format(instance_name))
 
     try:
-        result = client.get('/cloud/project/%s/instance/%s' % (service_name, instance_id))
+        result = resolver.fetched('instance', instance_id) or client.get('/cloud/project/%s/instance/%s' % (service_name, instance_id))
         if result['monthlyBilling'] is not None and result['monthlyBilling']['status'] == "ok":
             module.exit_json(changed=False, msg="Monthly billing already enabled")
 
         result = client.post('/cloud/project/%s/instance/%s/activeMonthlyBilling' % (service_name, instance_id))
+        if wait:
+            result = wait_for(
+                lambda: client.get('/cloud/project/%s/instance/%s' % (service_name, instance_id)),
+                lambda instance: instance['monthlyBilling'] is not None and instance['monthlyBilling']['status'] == "ok",
+                wait_timeout
+            )['monthlyBilling']
         module.exit_json(changed=True, **result)
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
-
-    try:
-        instance_list = client.get('/cloud/project/%s/instance' % (service_name))
-        for instance in instance_list:
-            if instance['name'] == instance_name:
-                try:
-                    result = client.get('/cloud/project/%s/instance/%s' % (service_name, instance['id']))
-                    if result['monthlyBilling'] is not None and result['monthlyBilling']['status'] == "ok":
-                        module.exit_json(changed=False, msg="Monthly billing already enabled")
-
-                    result = client.post('/cloud/project/%s/instance/%s/activeMonthlyBilling' % (service_name, instance['id']))
-                    module.exit_json(changed=True, **result)
-                except APIError as api_error:
-                    module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
-        module.fail_json(msg="Instance {} not found".format(instance_name))
-    except APIError as api_error:
-        module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+    except OvhWaitError as wait_error:
+        module.fail_json(msg="Monthly billing of instance {} not enabled: {}".format(instance_name, wait_error))
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'monthly_billing')
 
 
 if __name__ == '__main__':
@@ -67,7 +67,7 @@ EXAMPLES = '''
 
 RETURN = ''' # '''
 
-from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec, ovh_profile, OvhResolver
 
 try:
     from ovh.exceptions import APIError
@@ -120,50 +120,45 @@ def run_module():
     state = module.params['state']
     ttl = module.params['ttl']
 
+    resolver = OvhResolver(client, '/domain')
+
     try:
-        available_domains = client.get('/domain/zone')
-        if domain not in available_domains:
+        if not resolver.resolve('zone', domain):
             module.fail_json(msg="Domain {} unknown".format(domain))
     except APIError as api_error:
         module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
 
-    try:
-        existing_records = client.get(
-            '/domain/zone/%s/record' % domain,
-            fieldType=record_type,
-            subDomain=name
-        )
-    except APIError as api_error:
-        module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+    records = '/domain/zone/%s/record' % domain
 
     if state == 'present':
-        if len(existing_records) >= 1:
-            for index in existing_records:
-                try:
-                    record = client.get(
-                        '/domain/zone/%s/record/%s' % (domain, index)
-                    )
-                    if record['subDomain'] == name and record['target'] == target:
-                        module.exit_json(
-                            msg="{} is already registered on domain {}".format(name, domain),
-                            changed=False)
-                    else:
-                        result = client.post(
-                            '/domain/zone/%s/record' % domain,
-                            fieldType=record_type,
-                            subDomain=name,
-                            target=target,
-                            ttl=ttl
-                        )
-                        client.post(
-                            '/domain/zone/%s/refresh' % domain
-                        )
-                        module.exit_json(changed=True, **result)
-                except APIError as api_error:
-                    module.fail_json(
-                        msg="Failed to call OVH API: {0}".format(api_error))
+        try:
+            for record in client.iter_objects(records, fieldType=record_type, subDomain=name):
+                if record['subDomain'] == name and record['target'] == target:
+                    module.exit_json(
+                        msg="{} is already registered on domain {}".format(name, domain),
+                        changed=False)
+
+            result = client.post(
+                records,
+                fieldType=record_type,
+                subDomain=name,
+                target=target,
+                ttl=ttl
+            )
+            client.post(
+                '/domain/zone/%s/refresh' % domain
+            )
+            module.exit_json(changed=True, **result)
+        except APIError as api_error:
+            module.fail_json(
+                msg="Failed to call OVH API: {0}".format(api_error))
 
     else:
+        try:
+            existing_records = list(client.iter_objects(records, fieldType=record_type, subDomain=name))
+        except APIError as api_error:
+            module.fail_json(msg="Failed to call OVH API: {0}".format(api_error))
+
         if not existing_records:
             module.exit_json(
                 msg="Target {} doesn't exist on domain {}".format(
@@ -172,12 +167,9 @@ def run_module():
 
         record_deleted = []
         try:
-            for index in existing_records:
-                record = client.get(
-                    '/domain/zone/%s/record/%s' % (domain, index)
-                )
+            for record in existing_records:
                 client.delete(
-                    '/domain/zone/%s/record/%s' % (domain, index)
+                    '/domain/zone/%s/record/%s' % (domain, record['id'])
                 )
                 record_deleted.append("%s IN %s %s" % (
                     record.get('subDomain'), record.get('fieldType'), record.get('target')))
@@ -193,7 +185,7 @@ def run_module():
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'domain')
 
 
 if __name__ == '__main__':
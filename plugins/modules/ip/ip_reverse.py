@@ -47,7 +47,7 @@ mgdis.ovh.reverse_dns:
 
 RETURN = ''' # '''
 
-from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import ovh_api_connect, ovh_argument_spec, ovh_profile
 import urllib.parse
 import ipaddress
 
@@ -118,7 +118,7 @@ def run_module():
 
 
 def main():
-    run_module()
+    ovh_profile(run_module, 'ip_reverse')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Measure the API round trips, time and memory of each module.
+
+Every scenario runs a module against the fake API seeded with projects of
+10, 1,000 and 10,000 objects, twice with the same cache directory: a cold
+run and a warm one. The number of calls of each run is compared with
+``baseline.json`` and any increase fails the suite::
+
+    python tests/perf/benchmark.py
+    python tests/perf/benchmark.py --sizes 10 1000 --scenario db_cluster_user
+    python tests/perf/benchmark.py --update-baseline
+
+The targets are the last objects of each collection, the worst case for
+lookups which stop at the first match.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_ovh_api import Dataset, FakeOvhApi  # noqa: E402
+from runner import collection_path, run_module  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+SIZES = [10, 1000, 10000]
+SERVICE = 'bench'
+ENGINE = 'mongodb'
+
+
+def _last(api, template, **params):
+    """Return the last object of a collection of the fake API."""
+    params.setdefault('serviceName', SERVICE)
+    objects = api._objects(template, params)
+    return list(objects.values())[-1]
+
+
+def _instance(api):
+    return _last(api, '/cloud/project/{serviceName}/instance')
+
+
+def _volume(api):
+    return _last(api, '/cloud/project/{serviceName}/volume')
+
+
+def _cluster(api):
+    return _last(api, '/cloud/project/{serviceName}/database/{engine}', engine=ENGINE)
+
+
+def _clusters(api, count=5):
+    clusters = api._objects('/cloud/project/{serviceName}/database/{engine}', {'serviceName': SERVICE, 'engine': ENGINE})
+    return [dict([(key, cluster[key]) for key in ('version', 'plan', 'flavor', 'region')], name=cluster['description'])
+            for cluster in list(clusters.values())[-count:]]
+
+
+def _user(api):
+    return _last(api, '/cloud/project/{serviceName}/database/{engine}/{clusterId}/user',
+                 engine=ENGINE, clusterId=_cluster(api)['id'])
+
+
+# Scenarios: name -> (module, function returning the module arguments)
+SCENARIOS = {
+    'instance_info': ('instance_info', lambda api: {
+        'service_name': SERVICE, 'name': _instance(api)['name'],
+    }),
+    'flavor_info': ('flavor_info', lambda api: {
+        'service_name': SERVICE, 'name': 'r2-15', 'region': 'DE1',
+    }),
+    'image_info': ('image_info', lambda api: {
+        'service_name': SERVICE, 'name': 'Windows Server 2022', 'region': 'DE1',
+    }),
+    'instance_present': ('instance', lambda api: {
+        'service_name': SERVICE, 'name': _instance(api)['name'], 'region': _instance(api)['region'],
+        'flavor_name': 'b2-7', 'image_name': 'Debian 12',
+    }),
+    'instance_create': ('instance', lambda api: {
+        'service_name': SERVICE, 'name': 'bench-instance', 'region': 'GRA7', 'flavor_name': 'b2-7',
+        'image_name': 'Debian 12', 'ssh_key_name': 'sshkey-00000', 'wait': True,
+    }),
+    'monthly_billing': ('monthly_billing', lambda api: {
+        'service_name': SERVICE, 'name': _instance(api)['name'], 'wait': True,
+    }),
+    'block_storage_info': ('block_storage_info', lambda api: {
+        'service_name': SERVICE, 'name': _volume(api)['name'], 'region': _volume(api)['region'],
+    }),
+    'block_storage_create': ('block_storage', lambda api: {
+        'service_name': SERVICE, 'name': 'bench-volume', 'region': 'GRA7', 'size': 10,
+        'volume_type': 'classic', 'wait': True,
+    }),
+    'db_cluster_info': ('db_cluster_info', lambda api: {
+        'service_name': SERVICE, 'type': ENGINE, 'name': _cluster(api)['description'],
+    }),
+    'db_cluster_update': ('db_cluster', lambda api: {
+        'service_name': SERVICE, 'type': ENGINE, 'name': _cluster(api)['description'],
+        'version': _cluster(api)['version'], 'plan': _cluster(api)['plan'], 'flavor': _cluster(api)['flavor'],
+        'region': _cluster(api)['region'], 'wait': True,
+    }),
+    'db_cluster_bulk': ('db_cluster', lambda api: {
+        'service_name': SERVICE, 'type': ENGINE, 'version': '6.0', 'plan': 'essential', 'flavor': 'db1-4',
+        'region': 'GRA7', 'clusters': _clusters(api) + [{'name': 'bench-cluster-1'}, {'name': 'bench-cluster-2'}],
+        'wait': True,
+    }),
+    'db_cluster_user': ('db_cluster_user', lambda api: {
+        'service_name': SERVICE, 'type': ENGINE, 'name': _cluster(api)['description'],
+        'username': _user(api)['username'].split('@')[0], 'state': 'reset',
+    }),
+    'db_cluster_ip_restriction': ('db_cluster_ip_restriction', lambda api: {
+        'service_name': SERVICE, 'type': ENGINE, 'name': _cluster(api)['description'],
+        'ip_blocks': [{'ip': '198.51.100.1/32', 'description': 'bench'}], 'wait': True,
+    }),
+    'domain': ('domain', lambda api: {
+        'domain': 'example.com', 'name': 'bench', 'target': '192.0.2.1', 'record_type': 'A',
+    }),
+    'ip_reverse': ('ip_reverse', lambda api: {
+        'ip': '192.0.2.200', 'ip_block': '192.0.2.0/24', 'domain_name': 'bench.example.com.',
+    }),
+}
+
+
+def run_scenario(name, size, pythonpath, runs=2):
+    """Run a scenario ``runs`` times with one cache directory, return the measures of each run."""
+    module, arguments = SCENARIOS[name]
+    api = FakeOvhApi(Dataset(size))
+    url = api.start()
+    measures = []
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            args = dict(arguments(api), endpoint=url + '/1.0', application_key='key', application_secret='secret',
+                        consumer_key='consumer', cache_dir=cache_dir)
+            for _ in range(runs):
+                api.reset()
+                task = run_module(module, args, pythonpath)
+                stats = api.stats()
+                measures.append({
+                    'calls': stats['calls'],
+                    'bytes': stats['bytes'],
+                    'wall_time': round(task.wall_time, 3),
+                    'max_rss': task.max_rss,
+                    'error': task.error if task.failed else None,
+                    'routes': dict((route, counter['calls']) for route, counter in stats['routes'].items()),
+                })
+    finally:
+        api.stop()
+    return measures
+
+
+def _key(name, size):
+    return '%s@%d' % (name, size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--scenario', nargs='+', choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument('--baseline', default=BASELINE, help='call counts to compare with (default: %(default)s)')
+    parser.add_argument('--update-baseline', action='store_true', help='record the call counts as the new baseline')
+    parser.add_argument('--json', help='write the measures to this file')
+    parser.add_argument('--routes', action='store_true', help='print the calls of each route')
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as stream:
+            baseline = json.load(stream)
+
+    results = {}
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        pythonpath = collection_path(directory)
+        print('%-28s %6s | %6s %6s | %8s %8s | %9s | %s' % (
+            'scenario', 'size', 'cold', 'warm', 'cold s', 'warm s', 'peak KB', 'status'))
+        for name in args.scenario:
+            for size in args.sizes:
+                cold, warm = run_scenario(name, size, pythonpath)
+                key = _key(name, size)
+                results[key] = {'cold': cold, 'warm': warm}
+
+                status = []
+                for phase, measure in (('cold', cold), ('warm', warm)):
+                    if measure['error']:
+                        status.append('%s failed: %s' % (phase, measure['error']))
+                    expected = baseline.get(key, {}).get(phase)
+                    if expected is not None and measure['calls'] > expected:
+                        status.append('%s calls %d > %d' % (phase, measure['calls'], expected))
+                if status:
+                    failures.append('%s: %s' % (key, ', '.join(status)))
+                print('%-28s %6d | %6d %6d | %8.3f %8.3f | %9s | %s' % (
+                    name, size, cold['calls'], warm['calls'], cold['wall_time'], warm['wall_time'],
+                    max(cold['max_rss'] or 0, warm['max_rss'] or 0), ', '.join(status) or 'ok'))
+                if args.routes:
+                    for route, calls in sorted(cold['routes'].items()):
+                        print('    %6d  %s' % (calls, route))
+
+    if args.json:
+        with open(args.json, 'w') as stream:
+            json.dump(results, stream, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        baseline.update((key, {'cold': measures['cold']['calls'], 'warm': measures['warm']['calls']})
+                        for key, measures in results.items())
+        with open(args.baseline, 'w') as stream:
+            json.dump(baseline, stream, indent=2, sort_keys=True)
+            stream.write('\n')
+        return 0
+
+    for failure in failures:
+        print('FAIL %s' % failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,839 @@
+#!/usr/bin/env python3
+"""Local stand-in for the OVH API routes used by the collection.
+
+The server answers the cloud project (instance, flavor, image, snapshot,
+sshkey, volume, database), domain zone and ip reverse routes from a seeded
+dataset, so that modules can be benchmarked and tested without network
+access. It supports ``/auth/time``, the iceberg pagination headers and
+``X-Ovh-Batch``, can add latency and inject errors, and counts the calls
+made on each route. Signatures are not checked.
+
+Point modules at it with ``endpoint: http://127.0.0.1:<port>``::
+
+    python tests/perf/fake_ovh_api.py --port 8080 --size 1000 --latency 0.02
+
+Counters are served as JSON on ``GET /_fake/stats`` and reset with
+``DELETE /_fake/stats``; ``PUT /_fake/config`` changes ``latency``,
+``jitter``, ``error_rate``, ``throttle_rate``, ``rate_limit`` and ``settle``
+at runtime.
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+REGIONS = ['GRA7', 'SBG5', 'BHS5', 'DE1']
+FLAVORS = ['b2-7', 'b2-15', 'b2-30', 'c2-7', 'd2-2', 'd2-4', 'r2-15']
+IMAGES = ['Debian 11', 'Debian 12', 'Ubuntu 22.04', 'Rocky Linux 9', 'Windows Server 2022']
+DB_ENGINES = OrderedDict([
+    ('mongodb', ['5.0', '6.0']),
+    ('postgresql', ['13', '14', '15']),
+    ('mysql', ['8']),
+    ('redis', ['7.0']),
+])
+DB_PLANS = ['essential', 'business', 'enterprise']
+DB_FLAVORS = ['db1-4', 'db1-7', 'db1-15', 'db1-30']
+DB_NETWORKS = ['public', 'private']
+ZONE = 'example.com'
+IP_BLOCK = '192.0.2.0/24'
+
+# Collections: route template -> (key attribute, whether the listing returns
+# full objects instead of ids)
+COLLECTIONS = OrderedDict([
+    ('/domain', ('domain', False)),
+    ('/domain/zone', ('name', False)),
+    ('/domain/zone/{zoneName}/record', ('id', False)),
+    ('/ip', ('ip', False)),
+    ('/ip/{ip}/reverse', ('ipReverse', False)),
+    ('/cloud/project/{serviceName}/instance', ('id', True)),
+    ('/cloud/project/{serviceName}/flavor', ('id', True)),
+    ('/cloud/project/{serviceName}/image', ('id', True)),
+    ('/cloud/project/{serviceName}/snapshot', ('id', True)),
+    ('/cloud/project/{serviceName}/sshkey', ('id', True)),
+    ('/cloud/project/{serviceName}/volume', ('id', True)),
+    ('/cloud/project/{serviceName}/database/{engine}', ('id', False)),
+    ('/cloud/project/{serviceName}/database/{engine}/{clusterId}/user', ('id', False)),
+    ('/cloud/project/{serviceName}/database/{engine}/{clusterId}/ipRestriction', ('ip', False)),
+])
+
+# Routes which are not plain collections: template -> handler method name
+ACTIONS = OrderedDict([
+    ('GET /auth/time', '_auth_time'),
+    ('GET /cloud/project/{serviceName}', '_project'),
+    ('GET /cloud/project/{serviceName}/database/availability', '_availability'),
+    ('POST /cloud/project/{serviceName}/instance/{id}/activeMonthlyBilling', '_monthly_billing'),
+    ('POST /cloud/project/{serviceName}/volume/{id}/attach', '_attach'),
+    ('POST /cloud/project/{serviceName}/volume/{id}/detach', '_detach'),
+    ('POST /cloud/project/{serviceName}/volume/{id}/upsize', '_upsize'),
+    ('POST /cloud/project/{serviceName}/database/{engine}/{clusterId}/user/{id}/credentials/reset', '_reset_password'),
+    ('POST /domain/zone/{zoneName}/refresh', '_refresh'),
+])
+
+# IP blocks and restrictions hold a "/" once unquoted
+PARAM_PATTERNS = {'ip': r'[^/]+(?:/\d{1,3})?'}
+
+
+class FakeApiError(Exception):
+
+    def __init__(self, status, message, error_code=None):
+        super(FakeApiError, self).__init__(message)
+        self.status = status
+        self.error_code = error_code
+
+
+def _pattern(template, last=None):
+    regex = re.sub(
+        r'\\\{(\w+)\\\}',
+        lambda match: '(?P<%s>%s)' % (match.group(1), PARAM_PATTERNS.get(match.group(1), '[^/]+')),
+        re.escape(template),
+    )
+    if last:
+        regex += '/(?P<%s>%s)' % last
+    return re.compile('^%s$' % regex)
+
+
+def _compile_routes():
+    routes = []
+    for template, handler in ACTIONS.items():
+        method, path = template.split(' ', 1)
+        routes.append((method, template, _pattern(path), handler))
+    for collection in COLLECTIONS:
+        routes.append((None, collection, _pattern(collection), '_collection'))
+    # Most specific items first: the ids of IP collections may hold a "/",
+    # and the last segment of an item may be a batch of ids
+    for collection in sorted(COLLECTIONS, key=len, reverse=True):
+        last = ('id', '.+' if COLLECTIONS[collection][0] == 'ip' else '[^/]+')
+        routes.append((None, collection + '/{id}', _pattern(collection, last), '_item'))
+    return routes
+
+
+ROUTES = _compile_routes()
+
+
+def _min_nodes(plan):
+    return 1 if plan == 'essential' else 3
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _date(rng):
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1600000000 + rng.randint(0, 10 ** 8)))
+
+
+class Dataset(object):
+    """Seeded objects of the fake API, generated lazily per collection.
+
+    :param size: number of instances, volumes, database clusters per
+        engine, DNS records and reverses
+    :param users: number of users and IP restrictions per database cluster
+    :param seed: seed of the generated ids and attributes
+    """
+
+    def __init__(self, size=100, users=5, seed=0):
+        self.size = size
+        self.users = users
+        self.seed = seed
+        self.collections = {}
+        self.lock = threading.RLock()
+
+    def _rng(self, path):
+        return random.Random('%s:%s' % (self.seed, path))
+
+    def collection(self, template, params, path):
+        """Return the ``key -> object`` dict of the collection at ``path``."""
+        with self.lock:
+            if path not in self.collections:
+                self.collections[path] = self._generate(template, params, self._rng(path))
+            return self.collections[path]
+
+    def _generate(self, template, params, rng):
+        kind = template.rsplit('/', 1)[-1]
+        if template.endswith('/{engine}'):
+            kind = 'database'
+        generate = getattr(self, '_generate_%s' % kind.lower())
+        objects = OrderedDict()
+        for obj in generate(params, rng):
+            objects[str(obj[COLLECTIONS[template][0]])] = obj
+        return objects
+
+    def _generate_domain(self, params, rng):
+        return [{'domain': ZONE, 'state': 'ok'}]
+
+    def _generate_zone(self, params, rng):
+        return [self.zone(ZONE)]
+
+    def zone(self, name):
+        return {
+            'name': name,
+            'hasDnsAnycast': False,
+            'dnssecSupported': True,
+            'nameServers': ['dns100.ovh.net', 'ns100.ovh.net'],
+            'lastUpdate': '2024-01-01T00:00:00+01:00',
+        }
+
+    def _generate_record(self, params, rng):
+        types = ['A', 'AAAA', 'CNAME', 'TXT']
+        return [
+            self.record(params['zoneName'], 5000000000 + index, 'host-%05d' % index, types[index % len(types)],
+                        '192.0.2.%d' % (index % 254 + 1))
+            for index in range(self.size)
+        ]
+
+    def record(self, zone, record_id, sub_domain, field_type, target, ttl=0):
+        return {
+            'id': record_id,
+            'zone': zone,
+            'subDomain': sub_domain,
+            'fieldType': field_type,
+            'target': target,
+            'ttl': ttl,
+        }
+
+    def _generate_ip(self, params, rng):
+        return [{'ip': IP_BLOCK, 'type': 'cloud', 'description': None, 'routedTo': {'serviceName': None}}]
+
+    def _generate_reverse(self, params, rng):
+        return [
+            {'ipReverse': '192.0.2.%d' % (index % 254 + 1), 'reverse': 'host-%05d.%s.' % (index, ZONE)}
+            for index in range(min(self.size, 254))
+        ]
+
+    def _generate_instance(self, params, rng):
+        flavors = self.collection('/cloud/project/{serviceName}/flavor', params,
+                                  '/cloud/project/%s/flavor' % params['serviceName'])
+        images = self.collection('/cloud/project/{serviceName}/image', params,
+                                 '/cloud/project/%s/image' % params['serviceName'])
+        return [
+            self.instance('instance-%05d' % index, rng.choice(REGIONS), rng.choice(list(flavors)),
+                          rng.choice(list(images)), _uuid(rng), rng)
+            for index in range(self.size)
+        ]
+
+    def instance(self, name, region, flavor_id, image_id, instance_id, rng, status='ACTIVE'):
+        return {
+            'id': instance_id,
+            'name': name,
+            'region': region,
+            'flavorId': flavor_id,
+            'imageId': image_id,
+            'sshKeyId': None,
+            'status': status,
+            'created': _date(rng),
+            'monthlyBilling': None,
+            'ipAddresses': [{'ip': '198.51.100.%d' % rng.randint(1, 254), 'type': 'public', 'version': 4}],
+        }
+
+    def _generate_flavor(self, params, rng):
+        return [
+            {
+                'id': _uuid(rng),
+                'name': name,
+                'region': region,
+                'vcpus': 2 ** (index % 4),
+                'ram': 7000 * (index + 1),
+                'disk': 50 * (index + 1),
+                'osType': 'linux',
+                'available': True,
+            }
+            for region in REGIONS
+            for index, name in enumerate(FLAVORS)
+        ]
+
+    def _generate_image(self, params, rng):
+        return [
+            {
+                'id': _uuid(rng),
+                'name': name,
+                'region': region,
+                'type': 'windows' if name.startswith('Windows') else 'linux',
+                'visibility': 'public',
+                'status': 'active',
+                'creationDate': _date(rng),
+            }
+            for region in REGIONS
+            for name in IMAGES
+        ]
+
+    def _generate_snapshot(self, params, rng):
+        return [
+            {
+                'id': _uuid(rng),
+                'name': 'snapshot-%05d' % index,
+                'region': rng.choice(REGIONS),
+                'type': 'linux',
+                'visibility': 'private',
+                'status': 'active',
+                'creationDate': _date(rng),
+            }
+            for index in range(max(1, self.size // 10))
+        ]
+
+    def _generate_sshkey(self, params, rng):
+        return [
+            {
+                'id': _uuid(rng),
+                'name': 'sshkey-%05d' % index,
+                'regions': REGIONS,
+                'publicKey': 'ssh-ed25519 AAAAC3NzaC1lZDI1NTE5AAAA%032x' % rng.getrandbits(128),
+                'fingerPrint': '%032x' % rng.getrandbits(128),
+            }
+            for index in range(max(1, self.size // 10))
+        ]
+
+    def _generate_volume(self, params, rng):
+        return [
+            self.volume('volume-%05d' % index, rng.choice(REGIONS), rng.choice([10, 50, 100]), 'classic',
+                        _uuid(rng), rng)
+            for index in range(self.size)
+        ]
+
+    def volume(self, name, region, size, volume_type, volume_id, rng, status='available'):
+        return {
+            'id': volume_id,
+            'name': name,
+            'region': region,
+            'size': size,
+            'type': volume_type,
+            'status': status,
+            'bootable': False,
+            'attachedTo': [],
+            'creationDate': _date(rng),
+            'description': None,
+        }
+
+    def _generate_database(self, params, rng):
+        if params['engine'] not in DB_ENGINES:
+            raise FakeApiError(404, 'Engine %s does not exist' % params['engine'])
+        clusters = []
+        for index in range(self.size):
+            version, plan = rng.choice(DB_ENGINES[params['engine']]), rng.choice(DB_PLANS)
+            flavor, region = rng.choice(DB_FLAVORS), rng.choice(REGIONS)
+            # Clusters run the node count of their offer, as db_cluster sets it
+            clusters.append(self.cluster(params['engine'], 'cluster-%05d' % index, version, plan, flavor, region,
+                                         _min_nodes(plan), _uuid(rng), rng))
+        return clusters
+
+    def cluster(self, engine, description, version, plan, flavor, region, nodes, cluster_id, rng,
+                status='READY', network_type='public'):
+        domain = '%s-%s.database.cloud.ovh.net' % (engine, cluster_id[:8])
+        return {
+            'id': cluster_id,
+            'description': description,
+            'engine': engine,
+            'version': version,
+            'plan': plan,
+            'flavor': flavor,
+            'region': region,
+            'nodeNumber': nodes,
+            'networkType': network_type,
+            'status': status,
+            'createdAt': _date(rng),
+            'disk': {'size': 80, 'type': 'high-speed'},
+            'endpoints': [{
+                'component': engine,
+                'domain': domain,
+                'port': 27017 if engine == 'mongodb' else 5432,
+                'scheme': engine,
+                'ssl': True,
+                'sslMode': 'required',
+                'uri': '%s://<username>:<password>@%s' % (engine, domain),
+            }],
+        }
+
+    def _generate_user(self, params, rng):
+        return [
+            self.user(params['engine'], 'user-%05d' % index, _uuid(rng), rng)
+            for index in range(self.users)
+        ]
+
+    def user(self, engine, name, user_id, rng, status='READY'):
+        return {
+            'id': user_id,
+            'username': '%s@admin' % name if engine == 'mongodb' else name,
+            'status': status,
+            'createdAt': _date(rng),
+            'roles': ['readWriteAnyDatabase@admin'] if engine == 'mongodb' else [],
+        }
+
+    def _generate_iprestriction(self, params, rng):
+        return [
+            {'ip': '203.0.113.%d/32' % (index + 1), 'description': 'restriction-%05d' % index, 'status': 'READY'}
+            for index in range(min(self.users, 254))
+        ]
+
+    def availability(self):
+        return [
+            {
+                'engine': engine,
+                'version': version,
+                'plan': plan,
+                'region': region,
+                'flavor': flavor,
+                'network': network,
+                'default': False,
+                'status': 'STABLE',
+                'startDate': '2022-01-01T00:00:00Z',
+                'endOfLife': None,
+                'upstreamEndOfLife': None,
+                'backup': 'automatic',
+                'minNodeNumber': _min_nodes(plan),
+                'maxNodeNumber': 1 if plan == 'essential' else 10,
+                'minDiskSize': 80,
+                'maxDiskSize': 1280,
+            }
+            for engine, versions in DB_ENGINES.items()
+            for version in versions
+            for plan in DB_PLANS
+            for region in REGIONS
+            for flavor in DB_FLAVORS
+            for network in DB_NETWORKS
+        ]
+
+
+class FakeOvhApi(object):
+    """Route requests to the dataset, with latency, errors and counters.
+
+    :param dataset: Dataset served by the API
+    :param latency: seconds added to every response
+    :param jitter: maximum random seconds added on top of ``latency``
+    :param error_rate: fraction of requests answered with a 503
+    :param throttle_rate: fraction of requests answered with a 429
+    :param rate_limit: requests per second above which requests are
+        answered with a 429, like the API does for a busy application
+    :param settle: seconds a created or modified resource stays in a
+        transient status (BUILD, creating...) before reaching its final one
+    """
+
+    def __init__(self, dataset=None, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, rate_limit=0.0,
+                 settle=0.0, seed=0):
+        self.dataset = dataset or Dataset()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.settle = settle
+        self.rng = random.Random(seed)
+        self.counters = OrderedDict()
+        self.lock = threading.Lock()
+        self._tokens = rate_limit
+        self._refilled = time.time()
+        self.server = None
+        self.thread = None
+
+    # Counters
+
+    def _count(self, route, status, size):
+        with self.lock:
+            counter = self.counters.setdefault(route, {'calls': 0, 'errors': 0, 'throttled': 0, 'bytes': 0})
+            counter['calls'] += 1
+            counter['bytes'] += size
+            if status == 429:
+                counter['throttled'] += 1
+            elif status >= 400:
+                counter['errors'] += 1
+
+    def stats(self):
+        with self.lock:
+            routes = json.loads(json.dumps(self.counters))
+        return {
+            'calls': sum(counter['calls'] for counter in routes.values()),
+            'errors': sum(counter['errors'] for counter in routes.values()),
+            'throttled': sum(counter['throttled'] for counter in routes.values()),
+            'bytes': sum(counter['bytes'] for counter in routes.values()),
+            'routes': routes,
+        }
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+
+    def configure(self, **settings):
+        for name in ('latency', 'jitter', 'error_rate', 'throttle_rate', 'rate_limit', 'settle'):
+            if name in settings:
+                setattr(self, name, float(settings[name]))
+        if 'rate_limit' in settings:
+            self._tokens = self.rate_limit
+
+    def _over_rate_limit(self):
+        """Take a token from a bucket of ``rate_limit`` tokens refilled every second."""
+        if not self.rate_limit:
+            return False
+        with self.lock:
+            now = time.time()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens < 1:
+                return True
+            self._tokens -= 1
+            return False
+
+    # Server
+
+    def start(self, host='127.0.0.1', port=0):
+        """Serve in a background thread and return the endpoint URL."""
+        self.server = ThreadingHTTPServer((host, port), _handler(self))
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.url
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    # Requests
+
+    def handle(self, method, target, headers, body):
+        """Return the status, headers and JSON body answering a request."""
+        split = urlsplit(target)
+        path = unquote(split.path.rstrip('/')) or '/'
+        query = OrderedDict(parse_qsl(split.query, keep_blank_values=True))
+        data = json.loads(body) if body else None
+
+        route, match, handler = self._route(method, path)
+        if self.latency or self.jitter:
+            time.sleep(self.latency + self.rng.uniform(0, self.jitter))
+
+        extra = {}
+        try:
+            if route is None:
+                raise FakeApiError(404, 'Got an invalid (or empty) URL', 'CLIENT_NOT_FOUND')
+            if route != 'GET /auth/time':
+                roll = self.rng.random()
+                if self._over_rate_limit() or roll < self.throttle_rate:
+                    extra['Retry-After'] = '1'
+                    raise FakeApiError(429, 'Too many requests', 'TOO_MANY_REQUESTS')
+                if roll < self.throttle_rate + self.error_rate:
+                    raise FakeApiError(503, 'Service unavailable', 'SERVICE_UNAVAILABLE')
+            status, result = getattr(self, handler)(method, route, match.groupdict(), query, data, headers, extra)
+        except FakeApiError as error:
+            status = error.status
+            result = {'message': str(error), 'httpCode': str(status)}
+            if error.error_code:
+                result['errorCode'] = error.error_code
+        self._count(route or '%s %s' % (method, path), status, len(json.dumps(result)))
+        return status, extra, result
+
+    def _route(self, method, path):
+        for route_method, template, pattern, handler in ROUTES:
+            if route_method not in (None, method):
+                continue
+            match = pattern.match(path)
+            if match:
+                return '%s %s' % (method, template.split(' ', 1)[-1]), match, handler
+        return None, None, None
+
+    @staticmethod
+    def _collection_template(route):
+        template = route.split(' ', 1)[1]
+        return template[:-len('/{id}')] if template.endswith('/{id}') else template
+
+    def _objects(self, template, params):
+        """Return the objects of the collection, 404 when its parent is missing."""
+        parent = template.rsplit('/', 1)[0]
+        if parent.endswith('}'):
+            parent_template, parent_param = parent.rsplit('/', 1)
+            parent_param = parent_param.strip('{}')
+            if parent_template in COLLECTIONS:
+                siblings = self._objects(parent_template, params)
+                if params[parent_param] not in siblings:
+                    raise FakeApiError(404, 'The requested object (%s) does not exist' % params[parent_param],
+                                       'CLIENT_NOT_FOUND')
+        path = re.sub(r'\{(\w+)\}', lambda match: params[match.group(1)], template)
+        return self.dataset.collection(template, params, path)
+
+    def _settle(self, obj):
+        pending = obj.get('_pending')
+        if pending and time.time() >= pending[0]:
+            obj.update(pending[1])
+            del obj['_pending']
+        return obj
+
+    def _transition(self, obj, transient, final):
+        """Put ``obj`` in a transient status which turns final after ``settle`` seconds."""
+        if self.settle > 0:
+            obj['_pending'] = (time.time() + self.settle, final)
+            obj.update(transient)
+        else:
+            obj.update(final)
+
+    @staticmethod
+    def _public(obj):
+        return dict((key, value) for key, value in obj.items() if not key.startswith('_'))
+
+    def _get(self, objects, key):
+        with self.dataset.lock:
+            if key not in objects:
+                raise FakeApiError(404, 'The requested object (%s) does not exist' % key, 'CLIENT_NOT_FOUND')
+            return self._public(self._settle(objects[key]))
+
+    def _collection(self, method, route, params, query, data, headers, extra):
+        template = self._collection_template(route)
+        objects = self._objects(template, params)
+        key, full = COLLECTIONS[template]
+        if method == 'GET':
+            return 200, self._list(objects, key, full, query, headers, extra)
+        if method == 'POST':
+            return 200, self._create(template, objects, params, data or {})
+        raise FakeApiError(405, 'Method not allowed')
+
+    def _list(self, objects, key, full, query, headers, extra):
+        with self.dataset.lock:
+            selected = [self._settle(obj) for obj in objects.values() if self._matches(obj, query)]
+            selected = [self._public(obj) for obj in selected]
+
+        if headers.get('X-Pagination-Mode') == 'CachedObjectList-Pages':
+            size = int(headers.get('X-Pagination-Size') or 5000)
+            cursor = headers.get('X-Pagination-Cursor')
+            offset = int(base64.b64decode(cursor).decode()) if cursor else 0
+            if offset + size < len(selected):
+                extra['X-Pagination-Cursor-Next'] = base64.b64encode(str(offset + size).encode()).decode()
+            return selected[offset:offset + size]
+        return selected if full else [obj[key] for obj in selected]
+
+    @staticmethod
+    def _matches(obj, query):
+        for name, value in query.items():
+            if name == 'region' and 'regions' in obj:
+                if value not in obj['regions']:
+                    return False
+            elif name in obj and str(obj[name]) != value:
+                return False
+        return True
+
+    def _item(self, method, route, params, query, data, headers, extra):
+        template = self._collection_template(route)
+        objects = self._objects(template, params)
+        separator = headers.get('X-Ovh-Batch')
+        if method == 'GET' and separator:
+            return 200, self._batch(objects, params['id'].split(separator))
+        if method == 'GET':
+            return 200, self._get(objects, params['id'])
+        if method == 'PUT':
+            self._get(objects, params['id'])
+            with self.dataset.lock:
+                self._update(template, objects[params['id']], data or {})
+            return 200, None
+        if method == 'DELETE':
+            self._get(objects, params['id'])
+            with self.dataset.lock:
+                del objects[params['id']]
+            return 200, None
+        raise FakeApiError(405, 'Method not allowed')
+
+    def _batch(self, objects, keys):
+        results = []
+        for key in keys:
+            try:
+                results.append({'key': key, 'value': self._get(objects, key), 'error': None})
+            except FakeApiError as error:
+                results.append({'key': key, 'value': None, 'error': str(error)})
+        return results
+
+    # Creations and updates
+
+    def _create(self, template, objects, params, data):
+        kind = template.rsplit('/', 1)[-1]
+        dataset = self.dataset
+        rng = self.rng
+        if kind == 'instance':
+            obj = dataset.instance(data.get('name'), data.get('region'), data.get('flavorId'), data.get('imageId'),
+                                   _uuid(rng), rng)
+            obj['sshKeyId'] = data.get('sshKeyId')
+            self._transition(obj, {'status': 'BUILD'}, {'status': 'ACTIVE'})
+        elif kind == 'volume':
+            obj = dataset.volume(data.get('name'), data.get('region'), data.get('size'), data.get('type', 'classic'),
+                                 _uuid(rng), rng)
+            obj['description'] = data.get('description')
+            self._transition(obj, {'status': 'creating'}, {'status': 'available'})
+        elif kind == 'user':
+            obj = dataset.user(params['engine'], data.get('name'), _uuid(rng), rng)
+            obj['roles'] = data.get('roles') or obj['roles']
+            self._transition(obj, {'status': 'PENDING'}, {'status': 'READY'})
+        elif kind == 'ipRestriction':
+            obj = {'ip': data.get('ip'), 'description': data.get('description'), 'status': 'READY'}
+            self._transition(obj, {'status': 'PENDING'}, {'status': 'READY'})
+        elif kind == 'record':
+            obj = dataset.record(params['zoneName'], 6000000000 + rng.randint(0, 10 ** 8), data.get('subDomain', ''),
+                                 data.get('fieldType'), data.get('target'), data.get('ttl') or 0)
+        elif kind == 'reverse':
+            obj = {'ipReverse': data.get('ipReverse'), 'reverse': data.get('reverse')}
+        elif template.endswith('/{engine}'):
+            pattern = data.get('nodesPattern') or {}
+            obj = dataset.cluster(params['engine'], data.get('description'), data.get('version'), data.get('plan'),
+                                  pattern.get('flavor'), pattern.get('region'), pattern.get('number', 1), _uuid(rng),
+                                  rng, network_type='private' if data.get('networkId') else 'public')
+            self._transition(obj, {'status': 'CREATING'}, {'status': 'READY'})
+        else:
+            raise FakeApiError(405, 'Method not allowed')
+        with dataset.lock:
+            objects[str(obj[COLLECTIONS[template][0]])] = obj
+        if kind == 'user':
+            return dict(self._public(obj), password=_uuid(rng))
+        return self._public(obj)
+
+    def _update(self, template, obj, data):
+        if template.endswith('/{engine}'):
+            obj.update((key, value) for key, value in data.items() if key in obj)
+            if 'nodeNumber' in data:
+                obj['nodeNumber'] = data['nodeNumber']
+            self._transition(obj, {'status': 'UPDATING'}, {'status': 'READY'})
+        else:
+            obj.update(data)
+
+    # Actions
+
+    def _auth_time(self, method, route, params, query, data, headers, extra):
+        return 200, int(time.time())
+
+    def _project(self, method, route, params, query, data, headers, extra):
+        return 200, {'project_id': params['serviceName'], 'description': 'fake project', 'status': 'ok'}
+
+    def _availability(self, method, route, params, query, data, headers, extra):
+        return 200, self.dataset.availability()
+
+    def _instance(self, params):
+        instances = self._objects('/cloud/project/{serviceName}/instance', params)
+        self._get(instances, params['id'])
+        return instances[params['id']]
+
+    def _volume(self, params):
+        volumes = self._objects('/cloud/project/{serviceName}/volume', params)
+        self._get(volumes, params['id'])
+        return volumes[params['id']]
+
+    def _monthly_billing(self, method, route, params, query, data, headers, extra):
+        instance = self._instance(params)
+        with self.dataset.lock:
+            instance['monthlyBilling'] = {'since': _date(self.rng), 'status': 'activationPending'}
+            self._transition(instance, {}, {'monthlyBilling': dict(instance['monthlyBilling'], status='ok')})
+        return 200, self._public(instance)
+
+    def _attach(self, method, route, params, query, data, headers, extra):
+        volume = self._volume(params)
+        self._instance(dict(params, id=(data or {}).get('instanceId')))
+        with self.dataset.lock:
+            self._transition(volume, {'status': 'attaching'},
+                             {'status': 'in-use', 'attachedTo': [data['instanceId']]})
+        return 200, self._public(volume)
+
+    def _detach(self, method, route, params, query, data, headers, extra):
+        volume = self._volume(params)
+        with self.dataset.lock:
+            self._transition(volume, {'status': 'detaching'}, {'status': 'available', 'attachedTo': []})
+        return 200, self._public(volume)
+
+    def _upsize(self, method, route, params, query, data, headers, extra):
+        volume = self._volume(params)
+        with self.dataset.lock:
+            volume['size'] = (data or {}).get('size', volume['size'])
+        return 200, self._public(volume)
+
+    def _reset_password(self, method, route, params, query, data, headers, extra):
+        users = self._objects('/cloud/project/{serviceName}/database/{engine}/{clusterId}/user', params)
+        return 200, dict(self._get(users, params['id']), password=_uuid(self.rng))
+
+    def _refresh(self, method, route, params, query, data, headers, extra):
+        self._get(self._objects('/domain/zone', params), params['zoneName'])
+        return 200, None
+
+
+def _handler(api):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _respond(self, status, headers, result):
+            body = json.dumps(result).encode()
+            if 'gzip' in self.headers.get('Accept-Encoding', '') and len(body) > 1024:
+                body = gzip.compress(body)
+                headers = dict(headers, **{'Content-Encoding': 'gzip'})
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _control(self, body):
+            if self.command == 'GET' and self.path == '/_fake/stats':
+                return 200, api.stats()
+            if self.command == 'DELETE' and self.path == '/_fake/stats':
+                api.reset()
+                return 200, None
+            if self.command == 'PUT' and self.path == '/_fake/config':
+                api.configure(**json.loads(body or b'{}'))
+                return 200, None
+            return 404, {'message': 'Unknown control route'}
+
+        def _dispatch(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            if self.path.startswith('/_fake/'):
+                status, result = self._control(body)
+                return self._respond(status, {}, result)
+            # Endpoints end with /1.0 like https://eu.api.ovh.com/1.0
+            target = self.path[len('/1.0'):] if self.path.startswith('/1.0/') else self.path
+            status, headers, result = api.handle(self.command, target, self.headers, body)
+            self._respond(status, headers, result)
+
+        do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--size', type=int, default=100,
+                        help='instances, volumes, clusters per engine, records and reverses (default: 100)')
+    parser.add_argument('--users', type=int, default=5, help='users and IP restrictions per cluster (default: 5)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='maximum random seconds added to the latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with a 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='fraction of requests answered with a 429')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='requests per second above which requests are answered with a 429')
+    parser.add_argument('--settle', type=float, default=0.0,
+                        help='seconds created or modified resources stay in a transient status')
+    args = parser.parse_args()
+
+    api = FakeOvhApi(Dataset(args.size, args.users, args.seed), latency=args.latency, jitter=args.jitter,
+                     error_rate=args.error_rate, throttle_rate=args.throttle_rate, rate_limit=args.rate_limit, settle=args.settle,
+                     seed=args.seed)
+    api.start(args.host, args.port)
+    print('Fake OVH API listening on %s' % api.url, flush=True)
+    try:
+        api.thread.join()
+    except KeyboardInterrupt:
+        api.stop()
+
+
+if __name__ == '__main__':
+    main()
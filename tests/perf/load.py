@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Simulate plays of many hosts and forks against the fake API.
+
+Each task of the play runs on every host, ``forks`` hosts at a time, in a
+new process per host like AnsiballZ does, and all the hosts finish a task
+before the next one starts. For each fork count the harness reports the
+p50/p95/p99 task latency, the throttled requests, the retries and the API
+volume::
+
+    python tests/perf/load.py --hosts 500 --forks 5 50 200
+    python tests/perf/load.py --hosts 2000 --forks 200 --rate-limit 50 --option api_rate_limit=40
+    python tests/perf/load.py --task instance_info --option cache_ttl=0
+
+``--option`` sets a module option for every task, e.g. to compare the
+cache, connection pooling or controller-side rate limiting settings.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_ovh_api import Dataset, FakeOvhApi  # noqa: E402
+from runner import collection_path, run_module  # noqa: E402
+
+SERVICE = 'fleet'
+ENGINE = 'postgresql'
+
+
+def _cluster(api):
+    clusters = api._objects('/cloud/project/{serviceName}/database/{engine}', {'serviceName': SERVICE, 'engine': ENGINE})
+    return list(clusters.values())[-1]['description']
+
+
+def _volume(api, host, size):
+    volumes = api._objects('/cloud/project/{serviceName}/volume', {'serviceName': SERVICE})
+    return volumes[list(volumes)[host % size]]
+
+
+# Tasks: name -> (module, function of the API, host index and dataset size
+# returning the module arguments)
+TASKS = {
+    'instance_info': ('instance_info', lambda api, host, size: {
+        'service_name': SERVICE, 'name': 'instance-%05d' % (host % size),
+    }),
+    'block_storage_info': ('block_storage_info', lambda api, host, size: {
+        'service_name': SERVICE, 'name': _volume(api, host, size)['name'], 'region': _volume(api, host, size)['region'],
+    }),
+    'db_cluster_info': ('db_cluster_info', lambda api, host, size: {
+        'service_name': SERVICE, 'type': ENGINE, 'name': _cluster(api),
+    }),
+    'db_cluster_ip_restriction': ('db_cluster_ip_restriction', lambda api, host, size: {
+        'service_name': SERVICE, 'type': ENGINE, 'name': _cluster(api),
+        'ip_blocks': [{'ip': '10.%d.%d.%d/32' % (host >> 16 & 255, host >> 8 & 255, host & 255),
+                       'description': 'host-%05d' % host}],
+    }),
+    'domain': ('domain', lambda api, host, size: {
+        'domain': 'example.com', 'name': 'fleet-%05d' % host, 'target': '192.0.2.%d' % (host % 254 + 1),
+    }),
+}
+DEFAULT_TASKS = ['instance_info', 'db_cluster_ip_restriction', 'domain']
+
+
+def percentile(values, rank):
+    """Nearest-rank percentile of ``values``."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, int(round(rank / 100.0 * len(values))) - 1))]
+
+
+def _option(value):
+    name, _, raw = value.partition('=')
+    try:
+        return name, json.loads(raw)
+    except ValueError:
+        return name, raw
+
+
+def run_play(api, tasks, hosts, forks, size, options, pythonpath):
+    """Run the play and return its measures."""
+    api.reset()
+    latencies = []
+    failures = []
+    retries = 0
+    start = time.time()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        base = dict(endpoint=api.url + '/1.0', application_key='key', application_secret='secret',
+                    consumer_key='consumer', cache_dir=cache_dir, api_stats=True)
+        base.update(options)
+        with ThreadPoolExecutor(max_workers=forks) as executor:
+            for task in tasks:
+                module, arguments = TASKS[task]
+                runs = executor.map(
+                    lambda host: run_module(module, dict(base, **arguments(api, host, size)), pythonpath),
+                    range(hosts)
+                )
+                for host, run in enumerate(runs):
+                    latencies.append(run.wall_time)
+                    if run.failed:
+                        failures.append('%s on host %d: %s' % (task, host, run.error))
+                    elif isinstance(run.result.get('api_stats'), dict):
+                        retries += run.result['api_stats']['retries']
+    stats = api.stats()
+    return {
+        'forks': forks,
+        'tasks': len(latencies),
+        'play_time': round(time.time() - start, 3),
+        'p50': round(percentile(latencies, 50), 3),
+        'p95': round(percentile(latencies, 95), 3),
+        'p99': round(percentile(latencies, 99), 3),
+        'calls': stats['calls'],
+        'bytes': stats['bytes'],
+        'throttled': stats['throttled'],
+        'errors': stats['errors'],
+        'retries': retries,
+        'failed': len(failures),
+        'failures': failures[:10],
+        'routes': dict((route, counter['calls']) for route, counter in stats['routes'].items()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--hosts', type=int, default=500)
+    parser.add_argument('--forks', type=int, nargs='+', default=[5, 50, 200])
+    parser.add_argument('--task', nargs='+', choices=sorted(TASKS), default=DEFAULT_TASKS,
+                        help='tasks of the play (default: %s)' % ' '.join(DEFAULT_TASKS))
+    parser.add_argument('--size', type=int, default=1000, help='objects per collection of the fake API')
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds added to every API response')
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='requests per second the fake API accepts')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--option', action='append', type=_option, default=[], metavar='NAME=VALUE',
+                        help='module option set for every task, the value is parsed as JSON when possible')
+    parser.add_argument('--json', help='write the measures to this file')
+    args = parser.parse_args()
+
+    options = dict(args.option)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        pythonpath = collection_path(directory)
+        print('%6s %6s | %8s %7s %7s %7s | %7s %9s %9s %7s %7s | %6s' % (
+            'forks', 'tasks', 'play s', 'p50', 'p95', 'p99', 'calls', 'KB', 'throttled', 'errors', 'retries',
+            'failed'))
+        for forks in args.forks:
+            # A new API per play so that every play starts from the same dataset
+            api = FakeOvhApi(Dataset(args.size), latency=args.latency, jitter=args.jitter,
+                             error_rate=args.error_rate, rate_limit=args.rate_limit)
+            api.start()
+            try:
+                result = run_play(api, args.task, args.hosts, forks, args.size, options, pythonpath)
+            finally:
+                api.stop()
+            results.append(result)
+            print('%6d %6d | %8.2f %7.3f %7.3f %7.3f | %7d %9d %9d %7d %7d | %6d' % (
+                forks, result['tasks'], result['play_time'], result['p50'], result['p95'], result['p99'],
+                result['calls'], result['bytes'] // 1024, result['throttled'], result['errors'], result['retries'],
+                result['failed']))
+            for failure in result['failures']:
+                print('    %s' % failure, file=sys.stderr)
+
+    if args.json:
+        with open(args.json, 'w') as stream:
+            json.dump({'options': options, 'tasks': args.task, 'hosts': args.hosts, 'plays': results}, stream,
+                      indent=2, sort_keys=True)
+    return 1 if any(result['failed'] for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
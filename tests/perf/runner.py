@@ -0,0 +1,106 @@
+"""Run the collection modules in subprocesses, the way AnsiballZ does.
+
+Each task is a new Python process executing the module file with its
+arguments in a JSON file, so that nothing survives from one task to the
+next but what the modules keep on disk.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODULES = os.path.join(ROOT, 'plugins', 'modules')
+
+
+def collection_path(directory):
+    """Make the repository importable as ``ansible_collections.mgdis.ovh``."""
+    namespace = os.path.join(directory, 'ansible_collections', 'mgdis')
+    if not os.path.isdir(namespace):
+        os.makedirs(namespace)
+    link = os.path.join(namespace, 'ovh')
+    if not os.path.lexists(link):
+        os.symlink(ROOT, link)
+    return directory
+
+
+def module_file(name):
+    """Return the path of the ``name`` module, e.g. ``db_cluster_user``."""
+    for directory, _, files in os.walk(MODULES):
+        if name + '.py' in files:
+            return os.path.join(directory, name + '.py')
+    raise ValueError('Unknown module %s' % name)
+
+
+class Task(object):
+    """Outcome of a module run."""
+
+    def __init__(self, module, result, returncode, wall_time, max_rss, stderr):
+        self.module = module
+        self.result = result
+        self.returncode = returncode
+        self.wall_time = wall_time
+        # Kilobytes on Linux
+        self.max_rss = max_rss
+        self.stderr = stderr
+
+    @property
+    def failed(self):
+        return self.returncode != 0 or not isinstance(self.result, dict) or bool(self.result.get('failed'))
+
+    @property
+    def error(self):
+        if isinstance(self.result, dict) and self.result.get('msg'):
+            return self.result['msg']
+        return self.stderr.strip().splitlines()[-1] if self.stderr.strip() else 'no result'
+
+
+# Runs a module as its own __main__ and writes its peak memory on exit. The
+# peak is read from /proc: ru_maxrss of an exec'd child starts from the
+# peak of the process which forked it.
+WRAPPER = """
+import atexit, resource, runpy, sys
+
+def peak(path=sys.argv[3]):
+    try:
+        with open('/proc/self/status') as status:
+            kilobytes = [line.split()[1] for line in status if line.startswith('VmHWM:')][0]
+    except (IOError, IndexError):
+        kilobytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(path, 'w') as stream:
+        stream.write(str(kilobytes))
+
+atexit.register(peak)
+sys.argv = sys.argv[1:3]
+runpy.run_path(sys.argv[0], run_name='__main__')
+"""
+
+
+def run_module(module, args, pythonpath, env=None, python=sys.executable):
+    """Run ``module`` with ``args`` in a new process and return a Task."""
+    environment = dict(os.environ, **(env or {}))
+    environment['PYTHONPATH'] = os.pathsep.join(filter(None, [pythonpath, environment.get('PYTHONPATH')]))
+    with tempfile.TemporaryDirectory() as directory:
+        args_file = os.path.join(directory, 'args.json')
+        peak_file = os.path.join(directory, 'peak')
+        with open(args_file, 'w') as stream:
+            json.dump({'ANSIBLE_MODULE_ARGS': args}, stream)
+        start = time.time()
+        process = subprocess.Popen([python, '-c', WRAPPER, module_file(module), args_file, peak_file], env=environment,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output, errors = process.communicate()
+        wall_time = time.time() - start
+        try:
+            with open(peak_file) as stream:
+                max_rss = int(stream.read())
+        except (IOError, ValueError):
+            max_rss = None
+
+    try:
+        result = json.loads(output.decode())
+    except ValueError:
+        result = None
+    return Task(module, result, process.returncode, wall_time, max_rss, errors.decode(errors='replace'))
@@ -0,0 +1,72 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import ovh
+import pytest
+
+from ansible_collections.mgdis.ovh.plugins.httpapi import ovh as ovh_httpapi
+from ansible_collections.mgdis.ovh.plugins.httpapi.ovh import HttpApi
+
+OPTIONS = {
+    'application_key': 'key',
+    'application_secret': 'secret',
+    'consumer_key': 'consumer',
+    'root_path': '/1.0',
+}
+
+
+class Connection(object):
+    """Options of an ansible.netcommon.httpapi connection."""
+
+    def __init__(self, host='eu.api.ovh.com', port=None, use_ssl=True):
+        self.options = {'host': host, 'port': port, 'use_ssl': use_ssl}
+        # netcommon always puts the port in the connection URL
+        self._url = '%s://%s:%s' % ('https' if use_ssl else 'http', host, port or (443 if use_ssl else 80))
+
+    def get_option(self, name):
+        return self.options[name]
+
+
+def plugin(connection):
+    httpapi = HttpApi(connection)
+    httpapi.get_option = OPTIONS.get
+    httpapi._time_delta = 0
+    return httpapi
+
+
+def python_ovh_headers(method, path, data=None):
+    """Return the headers python-ovh sends for a request to the ovh-eu endpoint."""
+    client = ovh.Client(endpoint='ovh-eu', application_key=OPTIONS['application_key'],
+                        application_secret=OPTIONS['application_secret'], consumer_key=OPTIONS['consumer_key'])
+    client._time_delta = 0
+    sent = {}
+
+    def request(method, target, headers=None, data=None, timeout=None):
+        sent.update(headers)
+
+    client._session.request = request
+    client.raw_call(method, path, data=data)
+    return sent
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch):
+    monkeypatch.setattr(ovh_httpapi.time, 'time', lambda: 1700000000.0)
+
+
+@pytest.mark.parametrize('method, path, data', [
+    ('GET', '/cloud/project/abc/instance', None),
+    ('POST', '/cloud/project/abc/instance', {'name': 'web', 'region': 'GRA11'}),
+])
+def test_signature_matches_python_ovh(method, path, data):
+    expected = python_ovh_headers(method, path, data)
+    body = '' if data is None else ovh_httpapi.json.dumps(data, separators=(',', ':'))
+    headers = plugin(Connection())._signed_headers(method, path, body, {})
+    for name in ('X-Ovh-Consumer', 'X-Ovh-Timestamp', 'X-Ovh-Signature'):
+        assert headers[name] == expected[name]
+
+
+def test_api_url_leaves_the_default_port_out():
+    assert plugin(Connection()).api_url() == 'https://eu.api.ovh.com/1.0'
+    assert plugin(Connection(port=443)).api_url() == 'https://eu.api.ovh.com/1.0'
+    assert plugin(Connection(host='127.0.0.1', port=8080, use_ssl=False)).api_url() == 'http://127.0.0.1:8080/1.0'
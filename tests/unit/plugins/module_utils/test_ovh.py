@@ -0,0 +1,233 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pytest
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from ansible_collections.mgdis.ovh.plugins.module_utils import ovh as ovh_utils
+from ansible_collections.mgdis.ovh.plugins.module_utils.ovh import OvhClient, RateLimiter, RetryPolicy, SingleFlight, _response
+
+
+class Clock(object):
+    """Stand-in for time.time and time.sleep, sleeping moves the clock forward."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ovh_utils.time, 'time', clock.time)
+    monkeypatch.setattr(ovh_utils.time, 'sleep', clock.sleep)
+    return clock
+
+
+def answer(status, headers=None, body='{}'):
+    return _response('http://api/1.0/path', status, headers or {}, body)
+
+
+def client(responses):
+    """Return an OvhClient answering each request with the next of ``responses``, raising the exceptions."""
+    ovh_client = OvhClient(endpoint='ovh-eu', application_key='key', application_secret='secret', consumer_key='consumer')
+    pending = list(responses)
+
+    def send(method, path, data, need_auth, headers):
+        response = pending.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    ovh_client._send = send
+    return ovh_client
+
+
+def test_rate_limiter_burst_then_interval(tmp_path, clock):
+    limiter = RateLimiter(str(tmp_path / 'ratelimit'), rate=10, burst=2)
+    for _ in range(4):
+        limiter.acquire()
+    assert clock.sleeps == pytest.approx([0.1, 0.1])
+
+
+def test_rate_limiter_is_shared_through_its_file(tmp_path, clock):
+    first = RateLimiter(str(tmp_path / 'ratelimit'), rate=1)
+    second = RateLimiter(str(tmp_path / 'ratelimit'), rate=1)
+    first.acquire()
+    second.acquire()
+    assert clock.sleeps == pytest.approx([1.0])
+
+
+def test_rate_limiter_penalty_holds_every_process_back(tmp_path, clock):
+    RateLimiter(str(tmp_path / 'ratelimit'), rate=10, burst=5).penalize(2.0)
+    RateLimiter(str(tmp_path / 'ratelimit'), rate=10, burst=5).acquire()
+    assert clock.sleeps == pytest.approx([2.0])
+
+
+def test_throttled_request_penalizes_the_limiter(tmp_path, clock):
+    ovh_client = client([answer(429, {'Retry-After': '3'}), answer(200)])
+    ovh_client.rate_limiter = RateLimiter(str(tmp_path / 'ratelimit'), rate=10, burst=5)
+    assert ovh_client.raw_call('GET', '/path').status_code == 429
+    ovh_client.rate_limiter.acquire()
+    assert clock.sleeps == pytest.approx([3.0])
+
+
+def test_retry_policy_allows_idempotent_methods_only():
+    policy = RetryPolicy(retries=2)
+    assert policy.allows('get', 0) and policy.allows('DELETE', 1)
+    assert not policy.allows('GET', 2)
+    assert not policy.allows('POST', 0)
+    assert RetryPolicy(retries=2, methods=['post']).allows('POST', 0)
+
+
+def test_retry_policy_backoff_is_capped():
+    policy = RetryPolicy(backoff=0.5, max_delay=3.0, jitter=0.0)
+    assert [policy.delay(attempt) for attempt in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+
+def test_retry_policy_jitter_stays_below_the_backoff():
+    policy = RetryPolicy(backoff=1.0, max_delay=30.0, jitter=1.0)
+    delays = [policy.delay(2) for _ in range(100)]
+    assert all(0.0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retry_policy_waits_at_least_retry_after():
+    policy = RetryPolicy(backoff=0.5, jitter=0.0)
+    assert policy.delay(0, answer(429, {'Retry-After': '5'})) == 5.0
+    assert policy.delay(3, answer(429, {'Retry-After': '1'})) == 4.0
+    assert policy.delay(0, answer(503, {'Retry-After': 'soon'})) == 0.5
+
+
+def test_transient_failures_are_retried(clock):
+    ovh_client = client([answer(503), answer(429, {'Retry-After': '2'}), answer(200)])
+    ovh_client.retry_policy = RetryPolicy(retries=3, backoff=0.5, jitter=0.0)
+    assert ovh_client.raw_call('GET', '/path').status_code == 200
+    assert clock.sleeps == [0.5, 2.0]
+    assert [request['retry'] for request in ovh_client.stats.requests] == [0, 1, 2]
+
+
+def test_retries_stop_after_the_last_attempt(clock):
+    ovh_client = client([answer(503)] * 3)
+    ovh_client.retry_policy = RetryPolicy(retries=2, backoff=0.5, jitter=0.0)
+    assert ovh_client.raw_call('DELETE', '/path').status_code == 503
+    assert clock.sleeps == [0.5, 1.0]
+
+
+def test_non_idempotent_and_client_errors_are_not_retried(clock):
+    ovh_client = client([answer(503), answer(404)])
+    ovh_client.retry_policy = RetryPolicy(retries=3)
+    assert ovh_client.raw_call('POST', '/path').status_code == 503
+    assert ovh_client.raw_call('GET', '/path').status_code == 404
+    assert clock.sleeps == []
+
+
+def test_connection_errors_are_retried_then_raised(clock):
+    ovh_client = client([RequestsConnectionError('reset')] * 2)
+    ovh_client.retry_policy = RetryPolicy(retries=1, backoff=0.5, jitter=0.0)
+    with pytest.raises(RequestsConnectionError):
+        ovh_client.raw_call('GET', '/path')
+    assert clock.sleeps == [0.5]
+
+
+class Flight(object):
+    """Run a SingleFlight request in a thread, its fetch returns once released."""
+
+    def __init__(self, single_flight, body='{}', error=None):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+        self.result = None
+        self.error = None
+
+        def fetch():
+            self.calls += 1
+            self.started.set()
+            self.release.wait(5)
+            if error is not None:
+                raise error
+            return answer(200, body=body)
+
+        def run():
+            try:
+                self.result = single_flight.run('http://api/1.0/path', 'signature', fetch)
+            except Exception as flight_error:
+                self.error = flight_error
+
+        self.thread = threading.Thread(target=run)
+        self.thread.start()
+
+    def join(self):
+        self.release.set()
+        self.thread.join(5)
+
+
+def wait_for_waiters():
+    # Waiters block on the lock of the flight file, give them time to get there
+    time.sleep(0.2)
+
+
+def test_single_flight_leader_fetches_and_removes_its_file(tmp_path):
+    single_flight = SingleFlight(str(tmp_path))
+    response, shared = single_flight.run('http://api/1.0/path', 'signature', lambda: answer(200, body='[1]'))
+    assert (response.json(), shared) == ([1], False)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_single_flight_waiters_share_the_leader_answer(tmp_path):
+    single_flight = SingleFlight(str(tmp_path))
+    leader = Flight(single_flight, body='[1]')
+    assert leader.started.wait(5)
+    waiters = [Flight(single_flight, body='[2]') for _ in range(3)]
+    wait_for_waiters()
+    leader.join()
+    for waiter in waiters:
+        waiter.join()
+
+    assert (leader.result[0].json(), leader.result[1]) == ([1], False)
+    for waiter in waiters:
+        assert waiter.calls == 0
+        assert (waiter.result[0].json(), waiter.result[1]) == ([1], True)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_single_flight_waiters_fetch_again_after_a_failed_leader(tmp_path):
+    single_flight = SingleFlight(str(tmp_path))
+    leader = Flight(single_flight, error=RequestsConnectionError('reset'))
+    assert leader.started.wait(5)
+    waiters = [Flight(single_flight, body='[2]') for _ in range(3)]
+    for waiter in waiters:
+        waiter.release.set()
+    wait_for_waiters()
+    leader.join()
+    for waiter in waiters:
+        waiter.join()
+
+    assert isinstance(leader.error, RequestsConnectionError)
+    # One waiter flies the request again, the others share its answer
+    assert sum(waiter.calls for waiter in waiters) == 1
+    assert sorted(waiter.result[1] for waiter in waiters) == [False, True, True]
+    assert all(waiter.result[0].json() == [2] for waiter in waiters)
+
+
+def test_single_flight_never_serves_an_answer_older_than_the_request(tmp_path):
+    # A file left behind, e.g. by a killed leader, holds an older answer
+    path = os.path.join(str(tmp_path), hashlib.sha1(b'signature').hexdigest())
+    with open(path, 'w') as flight:
+        json.dump({'timestamp': time.time() - 60, 'status': 200, 'headers': {}, 'body': '[0]'}, flight)
+
+    response, shared = SingleFlight(str(tmp_path)).run('http://api/1.0/path', 'signature', lambda: answer(200, body='[1]'))
+    assert (response.json(), shared) == ([1], False)